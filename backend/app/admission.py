@@ -0,0 +1,182 @@
+import json
+import math
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
+from starlette.routing import Match
+
+try:
+    from fastapi.routing import iter_route_contexts
+except ImportError:  # FastAPI before nested routers: app.router.routes is already flat
+    def iter_route_contexts(routes):
+        return routes
+
+from app.auth import decode_access_token
+from app.cache import LRUCache
+from app.database import DB_MAX_OVERFLOW, DB_POOL_SIZE, pool_stats
+from app.metrics import request_metrics
+
+RATE_LIMITS_ENABLED = os.getenv("RATE_LIMITS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Token-bucket limits as "<requests>/<second|minute|hour>", keyed by "METHOD /route"
+# where the route is the declared path template (/api/tasks/{task_id}/claim);
+# "*" applies to every other route. "ip" limits per client address, "user" per
+# bearer token subject. RATE_LIMITS (JSON in the same shape) overrides entries.
+DEFAULT_RATE_LIMITS = {
+    "POST /api/auth/login": {"ip": "10/minute"},
+    "POST /api/auth/register": {"ip": "5/minute"},
+    "POST /api/tasks/": {"ip": "30/minute"},
+    "*": {"ip": "50/second", "user": "20/second"},
+}
+RATE_LIMITS = {**DEFAULT_RATE_LIMITS, **json.loads(os.getenv("RATE_LIMITS", "{}"))}
+
+# Clients whose bucket state is kept; the least recently seen are forgotten first
+RATE_LIMIT_TRACKED_CLIENTS = int(os.getenv("RATE_LIMIT_TRACKED_CLIENTS", "100000"))
+
+# Load shedding: answer 503 instead of queueing once any of these is exceeded
+SHED_MAX_IN_FLIGHT = int(os.getenv("SHED_MAX_IN_FLIGHT", "256"))
+SHED_MAX_CHECKOUT_WAIT = float(os.getenv("SHED_MAX_CHECKOUT_WAIT", "0.5"))
+SHED_MAX_POOL_WAITING = int(os.getenv("SHED_MAX_POOL_WAITING", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+SHED_RETRY_AFTER = int(os.getenv("SHED_RETRY_AFTER", "1"))
+
+# Never limited or shed, so probes and scrapes keep working under load
+EXEMPT_PATHS = ("/", "/health", "/health/pool", "/metrics")
+
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0}
+
+
+class RateLimit:
+    """A bucket of `capacity` tokens refilled evenly over `period` seconds"""
+
+    def __init__(self, spec: str):
+        count, _, period = spec.partition("/")
+        self.capacity = float(count)
+        self.rate = self.capacity / _PERIODS[period.strip()]
+
+    def __repr__(self) -> str:
+        return f"RateLimit(capacity={self.capacity}, rate={self.rate}/s)"
+
+
+class TokenBuckets:
+    """Token bucket state per (rule, client) key, bounded by an LRU"""
+
+    def __init__(self, maxsize: int):
+        self._buckets = LRUCache(maxsize=maxsize)
+
+    def take(self, key: tuple, limit: RateLimit) -> float:
+        """Take one token; returns 0 when allowed, otherwise seconds until a token is available"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (limit.capacity, now))
+        tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            return (1 - tokens) / limit.rate
+        self._buckets.set(key, (tokens - 1, now))
+        return 0.0
+
+
+class AdmissionController:
+    """
+    Decides per request whether to serve it, rate limit it (429) or shed it (503).
+
+    State is per worker process, so with N workers a client can get up to N
+    times the configured rate.
+    """
+
+    def __init__(self, rules: Dict[str, Dict[str, str]], tracked_clients: int = RATE_LIMIT_TRACKED_CLIENTS):
+        self.rules = {
+            route: {scope: RateLimit(spec) for scope, spec in limits.items()}
+            for route, limits in rules.items()
+        }
+        # The app's routes in matching order, filled in by bind_routes() at startup
+        self.routes: List = []
+        self.buckets = TokenBuckets(tracked_clients)
+        self.rate_limited = 0
+        self.shed = 0
+
+    def overloaded(self) -> Optional[str]:
+        """The reason to shed load right now, if any"""
+        if request_metrics.in_flight > SHED_MAX_IN_FLIGHT:
+            return "in_flight"
+        if pool_stats.waiting > SHED_MAX_POOL_WAITING:
+            return "pool_waiting"
+        if pool_stats.current_wait() > SHED_MAX_CHECKOUT_WAIT:
+            return "checkout_wait"
+        return None
+
+    def bind_routes(self, routes: Iterable) -> None:
+        """
+        Take the app's routes (app.router.routes) to resolve requests to route templates.
+
+        Fails on rules naming no route, which would otherwise silently never apply.
+        """
+        self.routes = list(iter_route_contexts(routes))
+        known = {
+            f"{method} {route.path}"
+            for route in self.routes
+            for method in getattr(route, "methods", None) or ()
+        }
+        unknown = sorted(key for key in self.rules if key != "*" and key not in known)
+        if unknown:
+            raise RuntimeError(f"RATE_LIMITS names routes that do not exist: {', '.join(unknown)}")
+
+    def rule_for(self, request: Request) -> Tuple[str, Dict[str, RateLimit]]:
+        """The rule key and limits for the route template the request will be routed to"""
+        # Admission runs before routing, so match the route here the way the router will
+        for route in self.routes:
+            match, _ = route.matches(request.scope)
+            if match == Match.FULL:
+                key = f"{request.method} {route.path}"
+                if key in self.rules:
+                    return key, self.rules[key]
+                break
+        return "*", self.rules.get("*", {})
+
+    def retry_after(self, request: Request) -> float:
+        """Seconds the caller must wait under its route's limits, or 0 if it may proceed"""
+        route, limits = self.rule_for(request)
+        wait = 0.0
+        ip_limit = limits.get("ip")
+        if ip_limit is not None:
+            client = request.client.host if request.client else "unknown"
+            wait = self.buckets.take((route, "ip", client), ip_limit)
+        user_limit = limits.get("user")
+        if wait == 0 and user_limit is not None:
+            authorization = request.headers.get("authorization", "")
+            if authorization.lower().startswith("bearer "):
+                user_id = decode_access_token(authorization[7:])
+                if user_id is not None:
+                    wait = self.buckets.take((route, "user", user_id), user_limit)
+        return wait
+
+    def check(self, request: Request) -> Optional[JSONResponse]:
+        """A 503 or 429 response when the request should not be served, else None"""
+        if request.method == "OPTIONS" or request.url.path in EXEMPT_PATHS:
+            return None
+
+        reason = self.overloaded()
+        if reason is not None:
+            self.shed += 1
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Server is busy, please retry shortly"},
+                headers={"Retry-After": str(SHED_RETRY_AFTER), "X-Shed-Reason": reason},
+            )
+
+        if not RATE_LIMITS_ENABLED:
+            return None
+        wait = self.retry_after(request)
+        if wait > 0:
+            self.rate_limited += 1
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Too many requests, please slow down"},
+                headers={"Retry-After": str(math.ceil(wait))},
+            )
+        return None
+
+
+admission = AdmissionController(RATE_LIMITS)
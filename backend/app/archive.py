@@ -0,0 +1,78 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import delete, insert, select
+
+from app import models
+from app.database import AsyncSessionLocal
+from app.enums import CLOSED_STATUSES
+from app.log import logger
+from app.tasks import invalidate_responses
+
+# Closed (completed or cancelled) tasks older than this move to tasks_archive
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+# Rows moved per transaction, so each batch holds its locks only briefly
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+# Seconds between archiver runs; 0 turns the background job off
+ARCHIVE_INTERVAL = float(os.getenv("ARCHIVE_INTERVAL", "600"))
+
+TASK_COLUMNS = tuple(models.Task.__table__.columns)
+
+
+async def archive_batch(db, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """
+    Move one batch of tasks closed before `cutoff` into tasks_archive.
+
+    The DELETE re-checks the closed condition and hands back the rows it
+    removed, so a task reopened in the meantime stays put and two workers
+    archiving at once never copy the same row twice.
+    """
+    tasks = models.Task.__table__
+    closed = (tasks.c.status.in_(CLOSED_STATUSES), tasks.c.closed_at < cutoff)
+    batch = select(tasks.c.id).where(*closed).order_by(tasks.c.closed_at).limit(batch_size)
+    moved = (await db.execute(
+        delete(tasks).where(tasks.c.id.in_(batch.scalar_subquery()), *closed).returning(*TASK_COLUMNS)
+    )).mappings().all()
+    if moved:
+        archived_at = datetime.now(timezone.utc)
+        await db.execute(insert(models.TaskArchive), [{**row, "archived_at": archived_at} for row in moved])
+    await db.commit()
+    return len(moved)
+
+
+async def archive_closed_tasks(
+    db,
+    older_than: timedelta = timedelta(days=ARCHIVE_AFTER_DAYS),
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    max_batches: Optional[int] = None
+) -> int:
+    """Archive closed tasks batch by batch until none are left (or max_batches ran); returns the count"""
+    cutoff = datetime.now(timezone.utc) - older_than
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = await archive_batch(db, cutoff, batch_size)
+        total += moved
+        batches += 1
+        if moved < batch_size:
+            break
+        await asyncio.sleep(0)
+    if total:
+        # Archived tasks drop out of the list responses; single-task reads still find them
+        invalidate_responses("tasks")
+    return total
+
+
+async def archive_closed_tasks_periodically(interval: float = ARCHIVE_INTERVAL) -> None:
+    """Background loop that keeps the hot tasks table down to open and recently closed tasks"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with AsyncSessionLocal() as db:
+                moved = await archive_closed_tasks(db)
+            if moved:
+                logger.info("Archived closed tasks", extra={"count": moved})
+        except Exception:
+            logger.exception("Error archiving closed tasks")
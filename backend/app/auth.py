@@ -1,28 +1,84 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from .database import SessionLocal
-from .schemas import UserCreate, UserLogin, UserResponse, TokenResponse, RegistrationSuccessResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from jose import JWTError, jwt
+from .cache import LRUCache
+from .database import get_db
+from .passwords import PasswordHasherBusy, password_hasher
+from .schemas import UserCreate, UserLogin, UserResponse, UserUpdate, TokenResponse, RegistrationSuccessResponse
 from . import models
-import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import os
 
 router = APIRouter(tags=["Authentication"])
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-def get_db():
-    db = SessionLocal()
+# Token signing settings. JWT_SECRET_KEY is required unless APP_ENV=development,
+# which falls back to a well-known key that must never sign production tokens.
+APP_ENV = os.getenv("APP_ENV", "production").lower()
+DEV_SECRET_KEY = "ablemate-dev-secret-change-me"
+SECRET_KEY = os.getenv("JWT_SECRET_KEY") or (DEV_SECRET_KEY if APP_ENV == "development" else None)
+ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+
+# Verified principals by user id, so authenticated requests skip the users query
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "300"))
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, detached from any database session"""
+    id: int
+    email: str
+    full_name: str
+    role: str
+    experience: Optional[str] = None
+
+principal_cache = LRUCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+def require_secret_key() -> None:
+    """Refuse to start without a token signing key outside development"""
+    if SECRET_KEY is None:
+        raise RuntimeError("JWT_SECRET_KEY is not set; set it, or APP_ENV=development to use the dev key")
+
+def invalidate_principal(user_id: int) -> None:
+    """Drop a cached principal after the user's profile or role changes"""
+    principal_cache.pop(user_id)
+
+def password_service_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+async def hash_password(password: str) -> str:
     try:
-        yield db
-    finally:
-        db.close()
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise password_service_busy()
 
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+def create_access_token(user: models.User) -> str:
+    expires = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    claims = {"sub": str(user.id), "role": user.role, "exp": expires}
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+def decode_access_token(token: str) -> Optional[int]:
+    """Verify a token's signature and expiry locally and return its user id"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return int(payload["sub"])
+    except (JWTError, KeyError, ValueError):
+        return None
 
 @router.post("/register", response_model=RegistrationSuccessResponse, status_code=status.HTTP_201_CREATED)
-async def register(user: UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(models.User).where(models.User.email == user.email))
+    existing_user = result.scalars().first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -32,7 +88,7 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     new_user = models.User(
         full_name=user.full_name,
         email=user.email,
-        password=hash_password(user.password),
+        password=await hash_password(user.password),
         dob=user.dob,
         gender=user.gender,
         role=user.role,
@@ -41,8 +97,8 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     )
 
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
 
     return {
         "message": "User registered successfully",
@@ -50,22 +106,30 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
     }
 
 @router.post("/login", response_model=TokenResponse)
-async def login(user: UserLogin, db: Session = Depends(get_db)):
-    hashed = hash_password(user.password)
-    db_user = db.query(models.User).filter(
-        models.User.email == user.email,
-        models.User.password == hashed
-    ).first()
-
-    if not db_user:
+async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(models.User).where(models.User.email == user.email))
+    db_user = result.scalars().first()
+
+    valid, new_hash = False, None
+    if db_user:
+        try:
+            valid, new_hash = await password_hasher.verify(user.password, db_user.password)
+        except PasswordHasherBusy:
+            raise password_service_busy()
+
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # TODO: Generate real JWT token here instead of dummy token
-    token = "generated_jwt_token_here"
+    # Upgrade legacy SHA-256 hashes and old cost factors now that we know the password
+    if new_hash:
+        db_user.password = new_hash
+        await db.commit()
+
+    token = create_access_token(db_user)
 
     return {
         "message": "Login successful",
@@ -73,20 +137,54 @@ async def login(user: UserLogin, db: Session = Depends(get_db)):
         "token_type": "bearer"
     }
 
-# This is the missing get_current_user dependency to fix your import error:
-
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    # For now, a dummy implementation that accepts the dummy token from login
-    if token != "generated_jwt_token_here":
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> Principal:
+    user_id = decode_access_token(token)
+    if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
-    # Find user by token - since token is dummy, just return the first user or dummy user
-    user = db.query(models.User).first()
+
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    user = await db.get(models.User, user_id)
     if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User no longer exists",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    principal = Principal(
+        id=user.id,
+        email=user.email,
+        full_name=user.full_name,
+        role=user.role,
+        experience=user.experience
+    )
+    principal_cache.set(user_id, principal)
+    return principal
+
+@router.put("/me", response_model=UserResponse)
+async def update_profile(
+    changes: UserUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    # Imported here: app.tasks depends on this module for authentication
+    from .tasks import invalidate_responses
+
+    user = await db.get(models.User, current_user.id)
+    for field, value in changes.model_dump(exclude_unset=True).items():
+        setattr(user, field, value)
+
+    await db.commit()
+    await db.refresh(user)
+    invalidate_principal(user.id)
+    # Task lists and single tasks embed the requester and volunteer
+    invalidate_responses("tasks", f"user:{user.id}")
 
-    return user
+    return UserResponse.model_validate(user)
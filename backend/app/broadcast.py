@@ -0,0 +1,103 @@
+import asyncio
+import json
+import os
+import uuid
+from typing import Callable, Optional
+
+from app.database import get_engine
+from app.log import logger
+from app.serializers import dumps
+
+# Postgres channel the server workers exchange task changes and cache invalidations on
+BROADCAST_CHANNEL = os.getenv("BROADCAST_CHANNEL", "ablemate_changes")
+# Messages waiting to be sent; more than this while the database is unreachable are dropped
+BROADCAST_QUEUE_SIZE = int(os.getenv("BROADCAST_QUEUE_SIZE", "10000"))
+# Seconds between attempts to re-establish the listening connection
+BROADCAST_RETRY = float(os.getenv("BROADCAST_RETRY", "1"))
+
+
+class ChangeBroadcast:
+    """
+    Fan-out of per-process state changes to every server worker via Postgres LISTEN/NOTIFY.
+
+    Each worker keeps its own response cache, matching index and event
+    stream, so a write handled by one worker must reach the others. publish()
+    queues a message; run() holds one pooled connection per worker that
+    LISTENs on the channel and sends the queued messages with pg_notify.
+    Messages from other workers are handed to the handler given to run().
+
+    NOTIFY is not durable: whatever is sent while a worker's connection is
+    down is lost, so after every (re)connect the worker announces a "resync"
+    and every worker treats its caches as stale. On other databases there is
+    no fan-out and the server must run a single worker (app.serve enforces it).
+    """
+
+    def __init__(self, channel: str = BROADCAST_CHANNEL, max_queue: int = BROADCAST_QUEUE_SIZE):
+        self.channel = channel
+        self.max_queue = max_queue
+        self.origin: Optional[str] = None
+        self.dropped = 0
+        self._outbox: Optional[asyncio.Queue] = None
+
+    @staticmethod
+    def supported() -> bool:
+        return get_engine().dialect.name == "postgresql"
+
+    def publish(self, message: dict) -> None:
+        """Queue a message for the other workers; a no-op when the broadcast is not running"""
+        if self._outbox is None:
+            return
+        try:
+            self._outbox.put_nowait(dumps({**message, "origin": self.origin}).decode())
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def run(self, handler: Callable[[dict], None]) -> None:
+        """Background loop: listen for other workers' messages and send ours, reconnecting on errors"""
+        # Set here rather than at import so each forked worker gets its own id
+        self.origin = uuid.uuid4().hex
+        self._outbox = asyncio.Queue(maxsize=self.max_queue)
+
+        def on_notify(connection, pid, channel, payload) -> None:
+            try:
+                message = json.loads(payload)
+                if message.get("origin") != self.origin:
+                    handler(message)
+            except Exception:
+                logger.exception("Error applying broadcast message")
+
+        try:
+            while True:
+                try:
+                    await self._listen(on_notify, handler)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Broadcast connection lost")
+                await asyncio.sleep(BROADCAST_RETRY)
+        finally:
+            self._outbox = None
+
+    async def _listen(self, on_notify, handler: Callable[[dict], None]) -> None:
+        async with get_engine().connect() as conn:
+            driver = (await conn.get_raw_connection()).driver_connection
+            closed = asyncio.Event()
+            driver.add_termination_listener(lambda connection: closed.set())
+            await driver.add_listener(self.channel, on_notify)
+            try:
+                # Anything sent while this worker was not listening is lost, and the
+                # others may have missed what it sent: everyone starts over
+                handler({"kind": "resync"})
+                self.publish({"kind": "resync"})
+                while not closed.is_set():
+                    try:
+                        payload = await asyncio.wait_for(self._outbox.get(), timeout=BROADCAST_RETRY)
+                    except asyncio.TimeoutError:
+                        continue
+                    await driver.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+            finally:
+                if not closed.is_set():
+                    await driver.remove_listener(self.channel, on_notify)
+
+
+change_broadcast = ChangeBroadcast()
@@ -0,0 +1,77 @@
+from enum import Enum
+
+
+class LabelEnum(str, Enum):
+    """
+    A closed set of string labels stored in the database as SMALLINT codes.
+
+    Members compare and hash like their string values, so "pending" and
+    TaskStatus.PENDING are interchangeable as dict keys and in comparisons.
+    Lookups are case-insensitive. A member's code is its position in the
+    class, so new members must only ever be appended.
+    """
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __hash__(self) -> int:
+        return str.__hash__(self)
+
+    @classmethod
+    def _missing_(cls, value):
+        if isinstance(value, str):
+            folded = value.strip().casefold()
+            for member in cls:
+                if member.value.casefold() == folded:
+                    return member
+        return None
+
+
+class TaskStatus(LabelEnum):
+    PENDING = "pending"
+    ACCEPTED = "accepted"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+
+
+# Terminal statuses: tasks moved into one are stamped with closed_at and later archived
+CLOSED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.CANCELLED)
+
+
+class TaskPriority(LabelEnum):
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+
+
+class TaskType(LabelEnum):
+    GROCERY_SHOPPING = "Grocery Shopping"
+    HOUSE_CLEANING = "House Cleaning"
+    COMPANIONSHIP = "Companionship"
+    TRANSPORTATION = "Transportation"
+    MEAL_PREPARATION = "Meal Preparation"
+    MEDICATION_REMINDERS = "Medication Reminders"
+    HELPING_WITH_EXERCISES = "Helping with Exercises"
+    MONITORING_HEALTH_CONDITIONS = "Monitoring Health Conditions"
+    ASSISTING_WITH_DOCTOR_VISITS = "Assisting with Doctor Visits"
+    MEDICAL = "Medical"
+    CHECK_IN = "Check-in"
+
+
+class UserRole(LabelEnum):
+    VOLUNTEER = "volunteer"
+    DEPENDENT = "dependent"
+    ADMIN = "admin"
+
+
+class Gender(LabelEnum):
+    MALE = "Male"
+    FEMALE = "Female"
+    OTHER = "Other"
+
+
+class StatsScope(LabelEnum):
+    ALL = "all"
+    USER = "user"
+    VOLUNTEER = "volunteer"
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import os
+from collections import deque
+from typing import AsyncIterator, Optional
+
+# How many recent events are kept for Last-Event-ID resume, and how many may queue per subscriber
+TASK_EVENT_HISTORY = int(os.getenv("TASK_EVENT_HISTORY", "1000"))
+TASK_EVENT_QUEUE_SIZE = int(os.getenv("TASK_EVENT_QUEUE_SIZE", "100"))
+TASK_EVENT_HEARTBEAT = float(os.getenv("TASK_EVENT_HEARTBEAT", "15"))
+
+
+def task_event_payload(task, previous_status=None) -> dict:
+    """The compact task fields carried by change events, plus the status the task changed from"""
+    return {
+        "id": task.id,
+        "title": task.title,
+        "priority": task.priority,
+        "status": task.status,
+        "previous_status": previous_status,
+        "task_type": task.task_type,
+        "user_id": task.user_id,
+        "volunteer_id": task.volunteer_id,
+    }
+
+
+class Subscription:
+    """One stream client: its filters and a bounded queue of pending events"""
+
+    def __init__(self, task_status: Optional[str], task_type: Optional[str], max_queue: int):
+        self.task_status = task_status
+        self.task_type = task_type
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+        self.stale = False
+
+    def matches(self, event: dict) -> bool:
+        task = event["task"]
+        # A status filter also sees tasks leaving that status, so clients can drop them
+        if self.task_status is not None and self.task_status not in (task["status"], task["previous_status"]):
+            return False
+        if self.task_type is not None and task["task_type"] != self.task_type:
+            return False
+        return True
+
+
+class TaskEventBroker:
+    """
+    In-process pub/sub for task change events.
+
+    publish() never blocks: a subscriber whose queue is full is dropped and
+    told to reconnect, and it can resume from its last event id as long as
+    that id is still in the history buffer. Older gaps get a "reset" event
+    telling the client to refetch.
+    """
+
+    def __init__(self, history: int = TASK_EVENT_HISTORY, max_queue: int = TASK_EVENT_QUEUE_SIZE):
+        self.max_queue = max_queue
+        self._history: deque = deque(maxlen=history)
+        self._subscribers: set = set()
+        self._last_id = 0
+
+    def publish(self, event_type: str, task, previous_status=None) -> dict:
+        self._last_id += 1
+        event = {"id": self._last_id, "type": event_type, "task": task_event_payload(task, previous_status)}
+        self._history.append(event)
+
+        for sub in list(self._subscribers):
+            if not sub.matches(event):
+                continue
+            try:
+                sub.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                sub.overflowed = True
+                self._subscribers.discard(sub)
+        return event
+
+    def subscribe(
+        self,
+        task_status: Optional[str] = None,
+        task_type: Optional[str] = None,
+        last_event_id: Optional[int] = None
+    ) -> Subscription:
+        sub = Subscription(task_status, task_type, self.max_queue)
+        if last_event_id is not None:
+            missed_history = self._history and self._history[0]["id"] > last_event_id + 1
+            if missed_history or last_event_id > self._last_id:
+                # The gap is older than our history (or predates a restart); the client must refetch
+                sub.stale = True
+                return sub
+            for event in self._history:
+                if event["id"] > last_event_id and sub.matches(event):
+                    try:
+                        sub.queue.put_nowait(event)
+                    except asyncio.QueueFull:
+                        sub.stale = True
+                        return sub
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def stream(self, sub: Subscription) -> AsyncIterator[str]:
+        """Render a subscription as a Server-Sent Events stream"""
+        try:
+            yield "retry: 3000\n\n"
+            if sub.stale:
+                # Missed events are gone: refetch the task list, then reconnect without an id
+                yield "event: reset\ndata: {}\n\n"
+                return
+            while True:
+                if sub.overflowed and sub.queue.empty():
+                    # Client fell behind: reconnect with Last-Event-ID to replay from history
+                    yield "event: reconnect\ndata: {}\n\n"
+                    return
+                try:
+                    event = await asyncio.wait_for(sub.queue.get(), timeout=TASK_EVENT_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event['task'])}\n\n"
+        finally:
+            self.unsubscribe(sub)
+
+
+task_events = TaskEventBroker()
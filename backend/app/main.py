@@ -1,11 +1,75 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.auth import router as auth_router
-from app.tasks import router as tasks_router
-from app.database import Base, engine
+from fastapi.responses import PlainTextResponse
+from app.admission import admission
+from app.archive import ARCHIVE_INTERVAL, archive_closed_tasks_periodically
+from app.auth import require_secret_key, router as auth_router
+from app.broadcast import change_broadcast
+from app.tasks import apply_broadcast, router as tasks_router
+from app.database import AsyncSessionLocal, dispose_engine, init_engine, pool_stats, pool_status, warm_up_pool
+from app.events import task_events
+from app.log import logger, setup_logging, shutdown_logging
+from app.matching import matching_index, rebuild_matching_index_periodically
+from app.metrics import render_prometheus, request_metrics, route_template
+from app.passwords import password_hasher
+from app.migrate import migrate
+from app.serializers import ORJSONResponse
+from app.stats import STATS_RECONCILE_INTERVAL, reconcile_counts_periodically
+from contextlib import asynccontextmanager
+import asyncio
+import os
+import time
 import uvicorn
 
-app = FastAPI(title="AbleMate API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Per-worker startup and shutdown.
+
+    Runs in each worker after fork: creates this worker's engine and pool,
+    opens the pool's connections ahead of the first request, builds the
+    matching index and starts the background jobs (index resync, cross-worker
+    broadcast, archiver, task count reconciliation).
+    Schema changes belong to `python -m app.migrate` (run once by
+    app.serve); set MIGRATE_ON_STARTUP=true to apply them here for
+    single-process development.
+    """
+    require_secret_key()
+    admission.bind_routes(app.router.routes)
+    setup_logging()
+    init_engine()
+    if os.getenv("MIGRATE_ON_STARTUP", "false").lower() in ("1", "true", "yes"):
+        await migrate()
+    await warm_up_pool()
+    async with AsyncSessionLocal() as db:
+        await matching_index.rebuild_from_db(db)
+    background = [asyncio.create_task(rebuild_matching_index_periodically())]
+    if change_broadcast.supported():
+        background.append(asyncio.create_task(change_broadcast.run(apply_broadcast)))
+    if ARCHIVE_INTERVAL > 0:
+        background.append(asyncio.create_task(archive_closed_tasks_periodically()))
+    if STATS_RECONCILE_INTERVAL > 0:
+        background.append(asyncio.create_task(reconcile_counts_periodically()))
+    logger.info("AbleMate API started successfully", extra={"pid": os.getpid(), "open_tasks": len(matching_index)})
+    try:
+        yield
+    finally:
+        for job in background:
+            job.cancel()
+        await dispose_engine()
+        password_hasher.shutdown()
+        shutdown_logging()
+
+app = FastAPI(title="AbleMate API", version="1.0.0", default_response_class=ORJSONResponse, lifespan=lifespan)
+
+# Rate limiting and load shedding; registered first so its 429/503 responses
+# still pass through CORS and the request metrics below
+@app.middleware("http")
+async def admission_control(request: Request, call_next):
+    rejection = admission.check(request)
+    if rejection is not None:
+        return rejection
+    return await call_next(request)
 
 # CORS for Flutter frontend - allow all origins for development
 app.add_middleware(
@@ -14,8 +78,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Retry-After"],
 )
 
+# Per-route latency, status codes and in-flight counts for /metrics
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    request_metrics.in_flight += 1
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        request_metrics.in_flight -= 1
+        path = route_template(request.scope)
+        request_metrics.observe(request.method, path, status_code, elapsed)
+        logger.debug(
+            "request",
+            extra={"method": request.method, "route": path, "status": status_code, "duration_ms": round(elapsed * 1000, 2)}
+        )
+
 # Include routers
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(tasks_router, prefix="/api/tasks", tags=["Tasks"])
@@ -30,17 +115,42 @@ async def root():
 async def health_check():
     return {"status": "healthy", "message": "API is working properly"}
 
-@app.on_event("startup")
-async def startup():
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully!")
-    print("AbleMate API started successfully!")
+# Connection pool saturation: checked-out connections, overflow, checkout waits and timeouts
+@app.get("/health/pool")
+async def pool_health():
+    return pool_status()
+
+# Prometheus scrape endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    pool = pool_status()
+    gauges = {
+        "db_pool_checked_out": pool.get("checked_out", 0),
+        "db_pool_idle": pool.get("idle", 0),
+        "db_pool_overflow": pool.get("overflow", 0),
+        "db_pool_waiting": pool["waiting"],
+        "task_stream_subscribers": task_events.subscriber_count,
+        "password_hash_pending": password_hasher.pending,
+    }
+    counters = {
+        "db_pool_checkout_timeouts_total": pool["timeouts"],
+        "admission_rate_limited_total": admission.rate_limited,
+        "admission_shed_total": admission.shed,
+    }
+    histograms = {"db_pool_checkout_wait_seconds": pool_stats.checkout_wait}
+    return PlainTextResponse(
+        render_prometheus(gauges, counters, histograms),
+        media_type="text/plain; version=0.0.4"
+    )
 
 if __name__ == "__main__":
+    # Development server with auto-reload; use `python -m app.serve` in production.
     # This ensures the server binds to all network interfaces (0.0.0.0)
     # so it can accept connections from other devices on the network
+    os.environ.setdefault("APP_ENV", "development")
+    os.environ.setdefault("MIGRATE_ON_STARTUP", "true")
     uvicorn.run(
-        "main:app", 
+        "app.main:app", 
         host="0.0.0.0",  # This is crucial for accepting external connections
         port=8000, 
         reload=True
@@ -0,0 +1,189 @@
+import asyncio
+import bisect
+import heapq
+import os
+import re
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app import models
+from app.database import AsyncSessionLocal
+from app.log import logger
+
+# Seconds between full rebuilds, which pick up writes made by other server workers
+MATCHING_REBUILD_INTERVAL = float(os.getenv("MATCHING_REBUILD_INTERVAL", "60"))
+
+# Columns kept per open task; enough to render a TaskOut without the database
+ENTRY_FIELDS = ("id", "title", "description", "priority", "status", "task_type", "user_id", "volunteer_id")
+
+# Which priorities a volunteer sees first, by experience tier
+PRIORITY_ORDER_EXPERIENCED = ("high", "medium", "low")
+PRIORITY_ORDER_INTERMEDIATE = ("medium", "high", "low")
+PRIORITY_ORDER_NEW = ("low", "medium", "high")
+
+_EXPERIENCE_PATTERN = re.compile(r"(\d+)\s*\+?\s*(month|year)", re.IGNORECASE)
+
+
+def experience_months(experience: Optional[str]) -> int:
+    """Parse a volunteer's experience ("6 months", "2 years", "5+ years") into months"""
+    if not experience:
+        return 0
+    match = _EXPERIENCE_PATTERN.search(experience)
+    if not match:
+        return 0
+    amount = int(match.group(1))
+    return amount * 12 if match.group(2).lower() == "year" else amount
+
+
+def priority_order(experience: Optional[str]) -> Tuple[str, ...]:
+    months = experience_months(experience)
+    if months >= 12:
+        return PRIORITY_ORDER_EXPERIENCED
+    if months >= 3:
+        return PRIORITY_ORDER_INTERMEDIATE
+    return PRIORITY_ORDER_NEW
+
+
+class Bucket:
+    """Open tasks for one (task_type, priority), iterated in id order whatever order they arrive in"""
+
+    def __init__(self):
+        self.entries: Dict[int, dict] = {}
+        self.ids: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[dict]:
+        return (self.entries[task_id] for task_id in self.ids)
+
+    def put(self, entry: dict) -> None:
+        task_id = entry["id"]
+        if task_id not in self.entries:
+            bisect.insort(self.ids, task_id)
+        self.entries[task_id] = entry
+
+    def remove(self, task_id: int) -> None:
+        del self.entries[task_id]
+        del self.ids[bisect.bisect_left(self.ids, task_id)]
+
+
+def task_entry(task) -> dict:
+    return {f: getattr(task, f) for f in ENTRY_FIELDS}
+
+
+class MatchingIndex:
+    """
+    Inverted index of open (pending) tasks keyed by (task_type, priority).
+
+    Each bucket keeps its tasks sorted by id, which is oldest first (also for
+    tasks reopened later), so a recommendation walks only the buckets it
+    needs and stops after `limit` tasks instead of scanning the table.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], Bucket] = {}
+        self._by_type: Dict[str, set] = {}
+        self._location: Dict[int, Tuple[str, str]] = {}
+        # Writes seen while a rebuild query is in flight, replayed on top of its result
+        self._recorders: List[list] = []
+
+    def __len__(self) -> int:
+        return len(self._location)
+
+    def add(self, task) -> None:
+        self._add_entry(task_entry(task))
+
+    def _add_entry(self, entry: dict) -> None:
+        self.discard(entry["id"])
+        key = (entry["task_type"], entry["priority"])
+        self._buckets.setdefault(key, Bucket()).put(entry)
+        self._by_type.setdefault(entry["task_type"], set()).add(key)
+        self._location[entry["id"]] = key
+
+    def discard(self, task_id: int) -> None:
+        key = self._location.pop(task_id, None)
+        if key is None:
+            return
+        bucket = self._buckets[key]
+        bucket.remove(task_id)
+        if not bucket:
+            del self._buckets[key]
+            keys = self._by_type[key[0]]
+            keys.discard(key)
+            if not keys:
+                del self._by_type[key[0]]
+
+    def apply(self, event_type: str, task) -> None:
+        """Keep the index in step with a task write (same events as the task stream)"""
+        entry = task_entry(task)
+        for recorded in self._recorders:
+            recorded.append((event_type, entry))
+        self._apply_entry(event_type, entry)
+
+    def _apply_entry(self, event_type: str, entry: dict) -> None:
+        if event_type != "task.deleted" and entry["status"] == "pending":
+            self._add_entry(entry)
+        else:
+            self.discard(entry["id"])
+
+    def rebuild(self, tasks) -> None:
+        self._buckets.clear()
+        self._by_type.clear()
+        self._location.clear()
+        for task in tasks:
+            self.add(task)
+
+    async def rebuild_from_db(self, db) -> None:
+        """Reload from the database, keeping writes applied while the query was running"""
+        query = select(*[getattr(models.Task, f) for f in ENTRY_FIELDS]).where(
+            models.Task.status == "pending"
+        ).order_by(models.Task.id)
+        recorded: list = []
+        self._recorders.append(recorded)
+        try:
+            rows = (await db.execute(query)).all()
+        finally:
+            self._recorders.remove(recorded)
+        self.rebuild(rows)
+        for event_type, entry in recorded:
+            self._apply_entry(event_type, entry)
+
+    def _open_tasks(self, priority: str, task_type: Optional[str]) -> Iterator[dict]:
+        if task_type is not None:
+            return iter(self._buckets.get((task_type, priority), ()))
+        buckets = [self._buckets[(t, priority)] for t in self._by_type if (t, priority) in self._buckets]
+        return heapq.merge(*buckets, key=lambda entry: entry["id"])
+
+    def recommend(
+        self,
+        volunteer_id: int,
+        experience: Optional[str],
+        limit: int = 10,
+        task_type: Optional[str] = None
+    ) -> List[dict]:
+        """Top open tasks for a volunteer: preferred priorities first, oldest first within each"""
+        results: List[dict] = []
+        for priority in priority_order(experience):
+            remaining = limit - len(results)
+            if remaining <= 0:
+                break
+            candidates = (e for e in self._open_tasks(priority, task_type) if e["user_id"] != volunteer_id)
+            results.extend(islice(candidates, remaining))
+        return results
+
+
+matching_index = MatchingIndex()
+
+
+async def rebuild_matching_index_periodically(interval: float = MATCHING_REBUILD_INTERVAL) -> None:
+    """Background loop that resyncs the index with the database"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with AsyncSessionLocal() as db:
+                await matching_index.rebuild_from_db(db)
+        except Exception:
+            logger.exception("Error rebuilding matching index")
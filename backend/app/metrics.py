@@ -0,0 +1,118 @@
+from typing import Iterable
+
+# Latency buckets in seconds, shared by every histogram in the app
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket histogram with cumulative counts in the Prometheus style"""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def snapshot(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, n in zip(self.buckets, self.counts):
+            cumulative += n
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.count
+        return {"buckets": buckets, "count": self.count, "sum": round(self.sum, 6)}
+
+
+class RequestMetrics:
+    """Per-route request latency, status codes and in-flight counts"""
+
+    def __init__(self):
+        self.latency = {}
+        self.responses = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status_code: int, seconds: float) -> None:
+        key = (method, route)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram()
+        histogram.observe(seconds)
+        status_key = (method, route, status_code)
+        self.responses[status_key] = self.responses.get(status_key, 0) + 1
+
+
+request_metrics = RequestMetrics()
+
+
+def route_template(scope: dict) -> str:
+    """The matched route as a template (/api/tasks/{task_id}) to keep label cardinality bounded"""
+    if scope.get("route") is None:
+        return "unmatched"
+    params = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    segments = []
+    for segment in scope["path"].split("/"):
+        name = params.pop(segment, None)
+        segments.append("{" + name + "}" if name is not None else segment)
+    return "/".join(segments)
+
+
+def _labels(**labels) -> str:
+    pairs = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _histogram_lines(name: str, histogram: Histogram, **labels) -> list:
+    lines = []
+    cumulative = 0
+    for bound, n in zip(histogram.buckets, histogram.counts):
+        cumulative += n
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}")
+    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {histogram.count}")
+    suffix = _labels(**labels) if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
+
+
+def render_prometheus(gauges: dict, counters: dict, histograms: dict) -> str:
+    """
+    Render request metrics plus extra app metrics in the Prometheus text format.
+
+    gauges and counters map a metric name to its value; histograms map a
+    metric name to a Histogram.
+    """
+    lines = [
+        "# HELP http_requests_in_flight Requests currently being handled",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {request_metrics.in_flight}",
+        "# HELP http_requests_total Completed requests by route and status code",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route, code), n in sorted(request_metrics.responses.items()):
+        lines.append(f"http_requests_total{_labels(method=method, route=route, status=code)} {n}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Request latency by route",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route), histogram in sorted(request_metrics.latency.items()):
+        lines += _histogram_lines("http_request_duration_seconds", histogram, method=method, route=route)
+
+    for name, value in gauges.items():
+        lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+    for name, value in counters.items():
+        lines += [f"# TYPE {name} counter", f"{name} {value}"]
+    for name, histogram in histograms.items():
+        lines += [f"# TYPE {name} histogram"] + _histogram_lines(name, histogram)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,252 @@
+# Schema migrations, run once per deploy before any server worker starts:
+#
+#     python -m app.migrate
+
+import asyncio
+from datetime import date, datetime, timezone
+from typing import Callable, List, Tuple
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, bindparam, func, inspect, select, text
+from sqlalchemy.schema import CreateTable
+
+from app import models
+from app.database import Base, dispose_engine, get_engine
+from app.enums import CLOSED_STATUSES, Gender, TaskPriority, TaskStatus, TaskType, UserRole
+from app.log import logger, setup_logging, shutdown_logging
+from app.search import install_search_index
+from app.stats import backfill_statements
+
+# Arbitrary key for pg_advisory_xact_lock, shared by every migration run
+MIGRATION_LOCK_ID = 4_718_201
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def initial_schema(connection) -> None:
+    """Tables and indexes from the models, plus the full-text search index"""
+    Base.metadata.create_all(connection)
+    install_search_index(connection)
+
+
+class MigrationError(RuntimeError):
+    """Existing data cannot be migrated as-is and has to be fixed by hand first"""
+
+
+# Text columns converted to SMALLINT enum codes by typed_columns, by table
+ENUM_COLUMNS = {
+    "users": {"gender": Gender, "role": UserRole},
+    "tasks": {"priority": TaskPriority, "status": TaskStatus, "task_type": TaskType},
+}
+
+
+def _label_case(column: str, enum_class) -> str:
+    """SQL mapping a text label (case- and whitespace-insensitive) to its enum code"""
+    whens = " ".join(
+        "WHEN '{}' THEN {}".format(member.value.lower().replace("'", "''"), code)
+        for code, member in enumerate(enum_class)
+    )
+    return f"CASE lower(trim({column})) {whens} END"
+
+
+def _check_labels(connection, table: str, column: str, enum_class) -> None:
+    labels = [member.value.lower() for member in enum_class]
+    unknown = connection.execute(
+        text(f"SELECT DISTINCT {column} FROM {table} WHERE lower(trim({column})) NOT IN :labels")
+        .bindparams(bindparam("labels", expanding=True)),
+        {"labels": labels}
+    ).scalars().all()
+    if unknown:
+        raise MigrationError(f"{table}.{column} has values outside {enum_class.__name__}: {unknown}")
+
+
+def _check_dates(connection) -> None:
+    bad = []
+    for user_id, dob in connection.execute(text("SELECT id, dob FROM users")):
+        try:
+            date.fromisoformat(dob.strip())
+        except (AttributeError, ValueError):
+            bad.append(user_id)
+    if bad:
+        raise MigrationError(f"users.dob is not a YYYY-MM-DD date for user ids: {bad[:50]}")
+
+
+def _rebuild_sqlite_table(connection, table: Table, expressions: dict) -> None:
+    """SQLite cannot change a column's type in place: copy into a new table and swap it in"""
+    new_name = f"{table.name}__new"
+    ddl = str(CreateTable(table).compile(dialect=connection.dialect)).strip()
+    connection.execute(text(ddl.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {new_name} ", 1)))
+    # Copy only the columns the old table has; later migrations may have added others to the model
+    existing = {c["name"] for c in inspect(connection).get_columns(table.name)}
+    columns = [c.name for c in table.columns if c.name in existing]
+    selected = ", ".join(expressions.get(c, c) for c in columns)
+    connection.execute(text(f"INSERT INTO {new_name} ({', '.join(columns)}) SELECT {selected} FROM {table.name}"))
+    connection.execute(text(f"DROP TABLE {table.name}"))
+    connection.execute(text(f"ALTER TABLE {new_name} RENAME TO {table.name}"))
+    for index in table.indexes:
+        index.create(connection)
+
+
+def typed_columns(connection) -> None:
+    """
+    Move status, priority, task_type, role and gender from free text to
+    SMALLINT enum codes, and users.dob from text to DATE.
+
+    Labels are matched case-insensitively; any value outside the enums, or a
+    dob that is not YYYY-MM-DD, aborts the migration with the offending data.
+    """
+    connection.execute(text("UPDATE tasks SET status = 'pending' WHERE status IS NULL"))
+    for table, columns in ENUM_COLUMNS.items():
+        for column, enum_class in columns.items():
+            _check_labels(connection, table, column, enum_class)
+    _check_dates(connection)
+
+    if connection.dialect.name == "postgresql":
+        for table, columns in ENUM_COLUMNS.items():
+            changes = [
+                f"ALTER COLUMN {column} TYPE smallint USING ({_label_case(column, enum_class)})"
+                for column, enum_class in columns.items()
+            ]
+            if table == "users":
+                changes.append("ALTER COLUMN dob TYPE date USING trim(dob)::date")
+            connection.execute(text(f"ALTER TABLE {table} {', '.join(changes)}"))
+    else:
+        for table in (models.User.__table__, models.Task.__table__):
+            expressions = {
+                column: _label_case(column, enum_class)
+                for column, enum_class in ENUM_COLUMNS[table.name].items()
+            }
+            if table.name == "users":
+                expressions["dob"] = "trim(dob)"
+            _rebuild_sqlite_table(connection, table, expressions)
+        # Dropping the old tasks table dropped the FTS triggers with it
+        install_search_index(connection)
+
+
+def task_archive(connection) -> None:
+    """
+    Add tasks.closed_at with its partial index and the tasks_archive table.
+
+    Tasks that are already completed or cancelled are stamped as closed now,
+    so they are archived once they reach ARCHIVE_AFTER_DAYS from today.
+    """
+    tasks = models.Task.__table__
+    if "closed_at" not in {c["name"] for c in inspect(connection).get_columns("tasks")}:
+        column_type = tasks.c.closed_at.type.compile(dialect=connection.dialect)
+        connection.execute(text(f"ALTER TABLE tasks ADD COLUMN closed_at {column_type}"))
+    for index in tasks.indexes:
+        if index.name == "ix_tasks_closed_at":
+            index.create(connection, checkfirst=True)
+    models.TaskArchive.__table__.create(connection, checkfirst=True)
+    connection.execute(
+        tasks.update()
+        .where(tasks.c.status.in_(CLOSED_STATUSES), tasks.c.closed_at.is_(None))
+        .values(closed_at=datetime.now(timezone.utc))
+    )
+
+
+def task_counts(connection) -> None:
+    """Add the task_counts table and fill it from the existing tasks"""
+    models.TaskCount.__table__.create(connection, checkfirst=True)
+    for statement in backfill_statements():
+        connection.execute(statement)
+
+
+def task_indexes(connection) -> None:
+    """
+    Create any tasks index the models define but the database lacks.
+
+    initial_schema only runs create_all, which skips indexes on tables that
+    already exist, so databases created before those indexes never got them.
+    """
+    for index in models.Task.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def task_ids_autoincrement(connection) -> None:
+    """
+    Stop SQLite from reusing task ids.
+
+    A plain INTEGER PRIMARY KEY hands out max(id) + 1, so once the newest
+    task was archived its id came back for the next task, and archiving
+    that one hit the tasks_archive primary key. AUTOINCREMENT needs a table
+    rebuild; the sequence then starts past every id in either table.
+    Postgres sequences never go backwards, so there is nothing to do there.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+    ddl = connection.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'tasks'")).scalar()
+    if "AUTOINCREMENT" not in ddl.upper():
+        _rebuild_sqlite_table(connection, models.Task.__table__, {})
+        install_search_index(connection)
+    last_id = connection.execute(text(
+        "SELECT max(id) FROM (SELECT max(id) AS id FROM tasks UNION ALL SELECT max(id) FROM tasks_archive)"
+    )).scalar() or 0
+    connection.execute(text("DELETE FROM sqlite_sequence WHERE name = 'tasks'"))
+    connection.execute(text("INSERT INTO sqlite_sequence (name, seq) VALUES ('tasks', :seq)"), {"seq": last_id})
+
+
+# (version, name, step) in the order they must run; steps take a sync connection
+MIGRATIONS: List[Tuple[int, str, Callable]] = [
+    (1, "initial schema", initial_schema),
+    (2, "typed enum and date columns", typed_columns),
+    (3, "closed_at and tasks_archive", task_archive),
+    (4, "task_counts", task_counts),
+    (5, "tasks indexes", task_indexes),
+    (6, "sqlite task id autoincrement", task_ids_autoincrement),
+]
+
+
+def upgrade(connection) -> List[int]:
+    """
+    Apply pending migrations on a sync connection and return the versions applied.
+
+    A fresh database gets the current schema from the models and is stamped
+    with every version; an existing one runs only the steps not yet recorded
+    in schema_migrations. On Postgres an advisory lock keeps two concurrent
+    runs from applying the same step.
+    """
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+    schema_migrations.create(connection, checkfirst=True)
+    applied = set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+    if not applied and not inspect(connection).has_table(models.Task.__tablename__):
+        # Empty database: build the current schema directly instead of replaying history
+        initial_schema(connection)
+        pending = MIGRATIONS
+    else:
+        pending = [m for m in MIGRATIONS if m[0] not in applied]
+        for version, name, step in pending:
+            logger.info("Applying migration", extra={"version": version, "migration": name})
+            step(connection)
+
+    if pending:
+        connection.execute(schema_migrations.insert(), [{"version": v, "name": n} for v, n, _ in pending])
+    return [v for v, _, _ in pending]
+
+
+async def migrate() -> List[int]:
+    """Bring the database schema up to date in a single transaction"""
+    async with get_engine().begin() as conn:
+        versions = await conn.run_sync(upgrade)
+    logger.info("Database schema up to date", extra={"applied": versions})
+    return versions
+
+
+async def main() -> None:
+    setup_logging()
+    try:
+        await migrate()
+    finally:
+        await dispose_engine()
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,29 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Date, DateTime, Integer, SmallInteger, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from app.database import Base
+from app.enums import Gender, StatsScope, TaskPriority, TaskStatus, TaskType, UserRole
+
+class SmallIntEnum(TypeDecorator):
+    """A LabelEnum stored as its 2-byte code (the member's position in the enum)"""
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, enum_class):
+        super().__init__()
+        self.enum_class = enum_class
+        self.members = list(enum_class)
+        self.codes = {member: code for code, member in enumerate(self.members)}
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return self.codes[self.enum_class(value)]
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self.members[value]
 
 class User(Base):
     __tablename__ = "users"
@@ -9,9 +32,9 @@ class User(Base):
     full_name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     password = Column(String, nullable=False)
-    dob = Column(String, nullable=False)
-    gender = Column(String, nullable=False)
-    role = Column(String, nullable=False)
+    dob = Column(Date, nullable=False)
+    gender = Column(SmallIntEnum(Gender), nullable=False)
+    role = Column(SmallIntEnum(UserRole), nullable=False)
     disability_status = Column(String, nullable=True)
     experience = Column(String, nullable=True)
 
@@ -25,12 +48,72 @@ class Task(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(String, nullable=False)
-    priority = Column(String, nullable=False)
-    status = Column(String, default="pending")
-    task_type = Column(String, nullable=False)
+    priority = Column(SmallIntEnum(TaskPriority), nullable=False)
+    status = Column(SmallIntEnum(TaskStatus), default=TaskStatus.PENDING)
+    task_type = Column(SmallIntEnum(TaskType), nullable=False)
 
     user_id = Column(Integer, ForeignKey("users.id"))
     volunteer_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    # When the task was completed or cancelled; the archiver moves it out some time after
+    closed_at = Column(DateTime(timezone=True), nullable=True)
 
     user = relationship("User", back_populates="tasks", foreign_keys=[user_id])
     volunteer = relationship("User", back_populates="volunteer_tasks", foreign_keys=[volunteer_id])
+
+    # Composite indexes for the filtered, id-ordered (keyset) task feed.
+    # The full-text index on title/description is created by app.search.install_search_index.
+    __table_args__ = (
+        Index("ix_tasks_status_id", "status", "id"),
+        Index("ix_tasks_priority_status_id", "priority", "status", "id"),
+        Index("ix_tasks_task_type_status_id", "task_type", "status", "id"),
+        Index("ix_tasks_user_id_id", "user_id", "id"),
+        Index("ix_tasks_volunteer_id_status_id", "volunteer_id", "status", "id"),
+        # Partial: only closed tasks are indexed, so the archiver finds its batches cheaply
+        Index(
+            "ix_tasks_closed_at",
+            "closed_at",
+            postgresql_where=closed_at.isnot(None),
+            sqlite_where=closed_at.isnot(None),
+        ),
+        # Never reuse the id of a deleted or archived task (SQLite otherwise
+        # hands out max(id) + 1 again, colliding with tasks_archive)
+        {"sqlite_autoincrement": True},
+    )
+
+class TaskArchive(Base):
+    """Closed tasks moved out of the hot tasks table by app.archive; same columns as Task"""
+    __tablename__ = "tasks_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    title = Column(String, nullable=False)
+    description = Column(String, nullable=False)
+    priority = Column(SmallIntEnum(TaskPriority), nullable=False)
+    status = Column(SmallIntEnum(TaskStatus))
+    task_type = Column(SmallIntEnum(TaskType), nullable=False)
+
+    user_id = Column(Integer, ForeignKey("users.id"))
+    volunteer_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    closed_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), nullable=False)
+
+    user = relationship("User", foreign_keys=[user_id])
+    volunteer = relationship("User", foreign_keys=[volunteer_id])
+
+    __table_args__ = (
+        Index("ix_tasks_archive_user_id_id", "user_id", "id"),
+        Index("ix_tasks_archive_volunteer_id_id", "volunteer_id", "id"),
+    )
+
+class TaskCount(Base):
+    """
+    Task counts per (status, priority, task_type), for everyone (owner_id 0),
+    per requester and per volunteer. Kept in step by app.stats.
+    """
+    __tablename__ = "task_counts"
+
+    scope = Column(SmallIntEnum(StatsScope), primary_key=True)
+    owner_id = Column(Integer, primary_key=True, autoincrement=False)
+    status = Column(SmallIntEnum(TaskStatus), primary_key=True)
+    priority = Column(SmallIntEnum(TaskPriority), primary_key=True)
+    task_type = Column(SmallIntEnum(TaskType), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,120 @@
+import asyncio
+import hashlib
+import hmac
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+# bcrypt cost factor; each +1 doubles the CPU time of a hash or verify
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "12"))
+# Worker processes doing the hashing, and how many hashes may run or wait at once.
+# Every server process has its own pool, so the default splits the CPUs between
+# the WEB_CONCURRENCY server processes (app.serve sets it) instead of giving
+# each of them all of them.
+SERVER_WORKERS = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 1) // SERVER_WORKERS))))
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", str(PASSWORD_HASH_WORKERS)))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+# Passwords stored before the move to bcrypt are bare SHA-256 hex digests
+LEGACY_SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+_contexts = {}
+
+
+def _context(rounds: int) -> CryptContext:
+    context = _contexts.get(rounds)
+    if context is None:
+        context = _contexts[rounds] = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    return context
+
+
+def _hash(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+
+def _verify_and_update(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return _context(rounds).verify_and_update(password, hashed)
+
+
+def _mp_context():
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context()
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full and the request should be shed"""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a bounded process pool so hashing never blocks the event loop.
+
+    At most `concurrency` hashes run at once and at most `max_queue` more may
+    wait for a slot; anything beyond that fails fast with PasswordHasherBusy.
+    """
+
+    def __init__(
+        self,
+        rounds: int = PASSWORD_HASH_ROUNDS,
+        workers: int = PASSWORD_HASH_WORKERS,
+        concurrency: int = PASSWORD_HASH_CONCURRENCY,
+        max_queue: int = PASSWORD_HASH_MAX_QUEUE
+    ):
+        self.rounds = rounds
+        self.workers = workers
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.concurrency + self.max_queue:
+            raise PasswordHasherBusy()
+        if self._executor is None:
+            # Created lazily so each server worker has its own pool. By now the process
+            # runs threads (log listener, database drivers), which a plain fork copies
+            # in whatever state they are in, so start the hashers from a forkserver.
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        self.pending += 1
+        try:
+            async with self._semaphore:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password against a stored hash.
+
+        Returns (valid, new_hash); new_hash is set when the stored hash is a
+        legacy SHA-256 digest or uses a different cost factor and should be
+        replaced.
+        """
+        if LEGACY_SHA256_PATTERN.match(hashed):
+            legacy = hashlib.sha256(password.encode()).hexdigest()
+            if not hmac.compare_digest(legacy, hashed):
+                return False, None
+            return True, await self.hash(password)
+        return await self._run(_verify_and_update, password, hashed, self.rounds)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._semaphore = None
+
+
+password_hasher = PasswordHasher()
@@ -1,5 +1,7 @@
-from pydantic import BaseModel, EmailStr, model_validator, Field
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, field_validator, model_validator, Field
+from typing import Any, Dict, Optional, List
+from datetime import date
+from app.enums import Gender, StatsScope, TaskPriority, TaskStatus, TaskType, UserRole
 
 # --- User Schemas ---
 
@@ -8,12 +10,19 @@ class UserCreate(BaseModel):
     email: EmailStr
     password: str
     confirm_password: str
-    dob: str
-    gender: str
-    role: str
+    dob: date
+    gender: Gender
+    role: UserRole
     disability_status: Optional[str] = None  # For dependents
     experience: Optional[str] = None         # For volunteers
 
+    @field_validator('role')
+    @classmethod
+    def check_role_self_assignable(cls, role: UserRole) -> UserRole:
+        if role == UserRole.ADMIN:
+            raise ValueError("Admin accounts cannot be self-registered")
+        return role
+
     @model_validator(mode='after')
     def check_passwords_match(self) -> 'UserCreate':
         if self.password != self.confirm_password:
@@ -28,15 +37,31 @@ class UserResponse(BaseModel):
     id: int
     full_name: str
     email: EmailStr
-    dob: str
-    gender: str
-    role: str
+    dob: date
+    gender: Gender
+    role: UserRole
     disability_status: Optional[str] = None
     experience: Optional[str] = None
 
     class Config:
         from_attributes = True
 
+class UserUpdate(BaseModel):
+    """Schema for updating the authenticated user's profile (the role cannot be changed here)"""
+    full_name: Optional[str] = None
+    dob: Optional[date] = None
+    gender: Optional[Gender] = None
+    disability_status: Optional[str] = None
+    experience: Optional[str] = None
+
+    @model_validator(mode='after')
+    def check_required_not_null(self) -> 'UserUpdate':
+        # Omitted fields are left alone, but these columns cannot be cleared
+        cleared = [f for f in ("full_name", "dob", "gender") if f in self.model_fields_set and getattr(self, f) is None]
+        if cleared:
+            raise ValueError(f"{', '.join(cleared)} cannot be null")
+        return self
+
 class RegistrationSuccessResponse(BaseModel):
     message: str
     user: UserResponse
@@ -50,8 +75,8 @@ class TokenResponse(BaseModel):
 class TaskBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200, description="Short description/title of the task")
     description: str = Field(..., min_length=1, max_length=1000, description="Detailed description of the task")
-    priority: str = Field(..., description="Priority level: low, medium, or high")
-    task_type: str = Field(..., description="Type/category of the task")
+    priority: TaskPriority = Field(..., description="Priority level: low, medium, or high")
+    task_type: TaskType = Field(..., description="Type/category of the task")
 
 class TaskCreate(TaskBase):
     """Schema for creating a new task"""
@@ -60,7 +85,7 @@ class TaskCreate(TaskBase):
 class TaskOut(TaskBase):
     """Schema for task output/response"""
     id: int
-    status: str = Field(default="pending", description="Current status of the task")
+    status: TaskStatus = Field(default=TaskStatus.PENDING, description="Current status of the task")
     user_id: Optional[int] = None
     user: Optional[UserResponse] = None
     volunteer_id: Optional[int] = None
@@ -78,13 +103,60 @@ class TaskUpdate(BaseModel):
     """Schema for updating task details"""
     title: Optional[str] = Field(None, min_length=1, max_length=200)
     description: Optional[str] = Field(None, min_length=1, max_length=1000)
-    priority: Optional[str] = None
-    task_type: Optional[str] = None
-    status: Optional[str] = None
+    priority: Optional[TaskPriority] = None
+    task_type: Optional[TaskType] = None
+    status: Optional[TaskStatus] = None
 
 class TaskStatusUpdate(BaseModel):
     """Schema for updating only task status"""
-    status: str = Field(..., description="New status for the task")
+    status: TaskStatus = Field(..., description="New status for the task")
+
+class TaskBulkCreate(BaseModel):
+    """
+    Schema for creating many tasks in one request
+
+    Items are kept raw and validated one by one against TaskCreate, so an
+    invalid item is reported in its own result instead of failing the batch.
+    """
+    tasks: List[Any] = Field(..., min_length=1, max_length=500)
+
+class TaskBulkStatusUpdate(BaseModel):
+    """Schema for moving many tasks to the same status"""
+    task_ids: List[int] = Field(..., min_length=1, max_length=500)
+    status: TaskStatus = Field(..., description="New status for the tasks")
+
+class BulkItemResult(BaseModel):
+    """Outcome for one item of a bulk request, by its position in the request"""
+    index: int
+    ok: bool
+    task_id: Optional[int] = None
+    error: Optional[str] = None
+
+class BulkResponse(BaseModel):
+    """Response schema for bulk task operations"""
+    message: str
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult]
+
+class TaskSearchResult(TaskBase):
+    """One full-text search hit: the task plus its rank and highlighted text"""
+    id: int
+    status: TaskStatus
+    user_id: Optional[int] = None
+    volunteer_id: Optional[int] = None
+    rank: float = Field(..., description="Relevance score; higher is better")
+    title_highlight: str = Field(..., description="HTML-escaped title with matched terms wrapped in <mark>")
+    snippet: str = Field(..., description="HTML-escaped description excerpt with matched terms wrapped in <mark>")
+
+class TaskStats(BaseModel):
+    """Task counts for everyone, one requester or one volunteer, archived tasks included"""
+    scope: StatsScope
+    owner_id: Optional[int] = Field(None, description="Requester or volunteer the counts are for; null for scope all")
+    total: int
+    by_status: Dict[TaskStatus, int]
+    by_priority: Dict[TaskPriority, int]
+    by_task_type: Dict[TaskType, int]
 
 # --- Health Check Schema ---
 
@@ -0,0 +1,164 @@
+import html
+import re
+from typing import List, Optional
+
+from sqlalchemy import Float, String, bindparam, text
+
+from app import models
+
+# Markers wrapped around matched terms in highlighted titles and snippets
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# Private-use characters the database wraps matches in; swapped for the markers once the text is escaped
+_MATCH_START = "\ue000"
+_MATCH_END = "\ue001"
+
+# Title matches count this many times more than description matches
+TITLE_WEIGHT = 10.0
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+RESULT_FIELDS = ("id", "title", "description", "priority", "status", "task_type", "user_id", "volunteer_id")
+
+# Postgres: a stored tsvector generated from title (weight A) and description (weight B), GIN indexed
+POSTGRES_DDL = (
+    "ALTER TABLE tasks ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_search_vector ON tasks USING GIN (search_vector)",
+)
+
+# SQLite: an external-content FTS5 table kept in step with tasks by triggers
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5("
+    "title, description, content='tasks', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF title, description ON tasks BEGIN "
+    "INSERT INTO tasks_fts(tasks_fts, rowid, title, description) "
+    "VALUES ('delete', old.id, old.title, old.description); "
+    "INSERT INTO tasks_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+)
+
+
+def install_search_index(connection) -> None:
+    """
+    Create the full-text index for the connected database (idempotent).
+
+    Runs on a sync connection, e.g. via AsyncConnection.run_sync. On SQLite
+    the FTS table is filled from existing tasks the first time it is created.
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            connection.execute(text(statement))
+    elif dialect == "sqlite":
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'")
+        ).first()
+        for statement in SQLITE_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+
+
+def search_terms(q: str) -> List[str]:
+    """Split a free-text query into plain word terms"""
+    return _TERM_PATTERN.findall(q)
+
+
+def _filters(task_status: Optional[str], task_type: Optional[str], params: dict) -> str:
+    clauses = ""
+    if task_status is not None:
+        clauses += " AND tasks.status = :task_status"
+        params["task_status"] = task_status
+    if task_type is not None:
+        clauses += " AND tasks.task_type = :task_type"
+        params["task_type"] = task_type
+    return clauses
+
+
+def _postgres_query(filters: str) -> str:
+    # Rank and page first using the GIN index, then build headlines for the page only
+    columns = ", ".join(f"tasks.{f}" for f in RESULT_FIELDS)
+    options = f'StartSel="{_MATCH_START}", StopSel="{_MATCH_END}"'
+    return (
+        f"SELECT page.*, "
+        f"ts_headline('english', page.title, page.tsq, 'HighlightAll=true, {options}') AS title_highlight, "
+        f"ts_headline('english', page.description, page.tsq, 'MaxFragments=2, {options}') AS snippet "
+        f"FROM (SELECT {columns}, tsq, "
+        f"ts_rank(tasks.search_vector, tsq) AS rank "
+        f"FROM tasks, websearch_to_tsquery('english', :q) AS tsq "
+        f"WHERE tasks.search_vector @@ tsq{filters} "
+        f"ORDER BY rank DESC, tasks.id LIMIT :limit OFFSET :skip) AS page "
+        f"ORDER BY page.rank DESC, page.id"
+    )
+
+
+def _sqlite_query(filters: str) -> str:
+    # bm25 is lower-is-better; negate it so rank sorts descending on both databases
+    columns = ", ".join(f"tasks.{f}" for f in RESULT_FIELDS)
+    return (
+        f"SELECT {columns}, "
+        f"-bm25(tasks_fts, {TITLE_WEIGHT}, 1.0) AS rank, "
+        f"highlight(tasks_fts, 0, '{_MATCH_START}', '{_MATCH_END}') AS title_highlight, "
+        f"snippet(tasks_fts, 1, '{_MATCH_START}', '{_MATCH_END}', '…', 24) AS snippet "
+        f"FROM tasks_fts JOIN tasks ON tasks.id = tasks_fts.rowid "
+        f"WHERE tasks_fts MATCH :q{filters} "
+        f"ORDER BY rank DESC, tasks.id LIMIT :limit OFFSET :skip"
+    )
+
+
+def highlight_html(value: Optional[str]) -> Optional[str]:
+    """HTML-escape a highlighted column and turn its match sentinels into <mark> tags"""
+    if value is None:
+        return None
+    return html.escape(value).replace(_MATCH_START, HIGHLIGHT_START).replace(_MATCH_END, HIGHLIGHT_END)
+
+
+async def search_tasks(
+    db,
+    q: str,
+    skip: int = 0,
+    limit: int = 20,
+    task_status: Optional[str] = None,
+    task_type: Optional[str] = None
+) -> List[dict]:
+    """
+    Ranked full-text search over task titles and descriptions.
+
+    Every term must match (Postgres also takes websearch syntax). Each result is a task row plus its rank, the title
+    with matches highlighted and a highlighted snippet of the description. The highlights are HTML: the task
+    text is escaped and only the <mark> tags are markup.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return []
+
+    params = {"skip": skip, "limit": limit}
+    filters = _filters(task_status, task_type, params)
+    if db.get_bind().dialect.name == "postgresql":
+        # websearch_to_tsquery accepts any input, including "quoted phrases" and -exclusions
+        params["q"] = q
+        statement = _postgres_query(filters)
+    else:
+        params["q"] = " ".join('"' + term + '"' for term in terms)
+        statement = _sqlite_query(filters)
+
+    # Typed so enum filters bind as their SMALLINT codes and come back as enum members
+    statement = text(statement).bindparams(
+        *[bindparam(name, type_=getattr(models.Task, column).type)
+          for name, column in (("task_status", "status"), ("task_type", "task_type")) if name in params]
+    ).columns(
+        **{f: getattr(models.Task, f).type for f in RESULT_FIELDS},
+        rank=Float, title_highlight=String, snippet=String
+    )
+    rows = (await db.execute(statement, params)).mappings().all()
+    return [
+        {**{f: row[f] for f in RESULT_FIELDS}, "rank": float(row["rank"]),
+         "title_highlight": highlight_html(row["title_highlight"]), "snippet": highlight_html(row["snippet"])}
+        for row in rows
+    ]
@@ -0,0 +1,61 @@
+import json
+from datetime import date
+from typing import Any, Iterable
+
+from fastapi.responses import JSONResponse
+
+from app import schemas
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+# TaskOut/UserResponse field names, so the fast path stays in step with the schemas
+TASK_OUT_FIELDS = tuple(schemas.TaskOut.model_fields)
+TASK_USER_FIELDS = ("user", "volunteer")
+USER_OUT_FIELDS = tuple(schemas.UserResponse.model_fields)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=_default).encode()
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it is installed"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def user_to_dict(user) -> dict:
+    return {f: getattr(user, f) for f in USER_OUT_FIELDS}
+
+
+def task_to_dict(task) -> dict:
+    """
+    Build the TaskOut shape straight from a loaded Task row.
+
+    Rows read from our own database already satisfy the schema, so this
+    skips pydantic validation (including EmailStr checks on nested users).
+    """
+    data = {}
+    for field in TASK_OUT_FIELDS:
+        value = getattr(task, field)
+        if field in TASK_USER_FIELDS and value is not None:
+            value = user_to_dict(value)
+        data[field] = value
+    return data
+
+
+def tasks_to_json(tasks: Iterable) -> bytes:
+    """Serialize a list of eagerly loaded Task rows as a TaskOut JSON array"""
+    return dumps([task_to_dict(t) for t in tasks])
@@ -0,0 +1,132 @@
+# Production entry point, run from the backend directory:
+#
+#     python -m app.serve --workers 4
+#
+# Applies pending migrations once, then serves app.main:app from several
+# worker processes under gunicorn (uvicorn's own process manager where
+# gunicorn is unavailable, e.g. on Windows).
+#
+# Workers share task changes and cache invalidations over Postgres
+# LISTEN/NOTIFY (app.broadcast). Other databases have no such channel, so
+# there the response cache, matching index and /api/tasks/stream would only
+# see one worker's writes: they get a single worker. Stream event ids are
+# per worker, so Last-Event-ID resume assumes sticky sessions.
+
+import argparse
+import asyncio
+import os
+import sys
+
+import uvicorn
+from sqlalchemy.engine import make_url
+
+from app import migrate
+from app.database import DATABASE_URL, async_database_url
+from app.auth import require_secret_key
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+# Seconds a worker gets to finish in-flight requests after SIGTERM before it is killed
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+KEEPALIVE = int(os.getenv("KEEPALIVE", "5"))
+# Recycle a worker after this many requests (plus jitter); 0 disables
+MAX_REQUESTS = int(os.getenv("MAX_REQUESTS", "0"))
+
+
+def default_workers() -> int:
+    """
+    One async worker per available CPU, overridable with WEB_CONCURRENCY
+    (Postgres only; see the note at the top of this module).
+
+    Each worker has its own connection pool, so the database sees up to
+    workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+    """
+    if "WEB_CONCURRENCY" in os.environ:
+        return int(os.environ["WEB_CONCURRENCY"])
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def uvicorn_worker_class() -> str:
+    try:
+        import uvicorn_worker  # noqa: F401
+        return "uvicorn_worker.UvicornWorker"
+    except ImportError:
+        return "uvicorn.workers.UvicornWorker"
+
+
+def run_gunicorn(host: str, port: int, workers: int) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    options = {
+        "bind": f"{host}:{port}",
+        "workers": workers,
+        "worker_class": uvicorn_worker_class(),
+        # Import the app once in the master; engines and pools are created per worker after fork
+        "preload_app": True,
+        "graceful_timeout": GRACEFUL_TIMEOUT,
+        "timeout": GRACEFUL_TIMEOUT * 2,
+        "keepalive": KEEPALIVE,
+        "max_requests": MAX_REQUESTS,
+        "max_requests_jitter": MAX_REQUESTS // 10,
+        "forwarded_allow_ips": os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+    }
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+            return app
+
+    Server().run()
+
+
+def run_uvicorn(host: str, port: int, workers: int) -> None:
+    uvicorn.run(
+        "app.main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        timeout_keep_alive=KEEPALIVE,
+        limit_max_requests=MAX_REQUESTS or None,
+        proxy_headers=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the AbleMate API with multiple workers")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument("--skip-migrations", action="store_true", help="assume the schema is already up to date")
+    args = parser.parse_args()
+
+    require_secret_key()
+    workers = args.workers
+    # Read off the URL: an engine created here would be inherited by every forked worker
+    if workers > 1 and make_url(async_database_url(DATABASE_URL)).get_backend_name() != "postgresql":
+        print(f"Cross-worker updates need Postgres; running 1 worker instead of {workers}", file=sys.stderr)
+        workers = 1
+    # Per-process pools (e.g. the password hashers) size themselves from this
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    if not args.skip_migrations:
+        asyncio.run(migrate.main())
+    # Workers must not run DDL themselves
+    os.environ["MIGRATE_ON_STARTUP"] = "false"
+
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        run_uvicorn(args.host, args.port, workers)
+    else:
+        run_gunicorn(args.host, args.port, workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import asyncio
+import os
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, insert, literal, select, text, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import models
+from app.database import AsyncSessionLocal, get_engine
+from app.enums import StatsScope, TaskPriority, TaskStatus, TaskType
+from app.log import logger
+
+# Seconds between recounts of task_counts from the task tables; 0 turns the job off
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", "3600"))
+# Arbitrary key for the pg_try_advisory_lock that picks the one worker running the reconciler
+RECONCILE_LOCK_ID = 4_718_202
+
+# The task columns a counter row is keyed on
+STATE_FIELDS = ("status", "priority", "task_type", "user_id", "volunteer_id")
+
+# A task as the counters see it: (status, priority, task_type, user_id, volunteer_id)
+TaskState = Tuple[Optional[TaskStatus], Optional[TaskPriority], Optional[TaskType], Optional[int], Optional[int]]
+
+COUNT_KEY = ("scope", "owner_id", "status", "priority", "task_type")
+
+
+def task_state(task) -> TaskState:
+    """The counted fields of a task (ORM object or RETURNING row)"""
+    return tuple(getattr(task, field) for field in STATE_FIELDS)
+
+
+def counter_keys(state: TaskState) -> List[tuple]:
+    """The task_counts rows a task in `state` contributes one to"""
+    task_status, priority, task_type, user_id, volunteer_id = state
+    if task_status is None or priority is None or task_type is None:
+        return []
+    keys = [(StatsScope.ALL, 0, task_status, priority, task_type)]
+    if user_id is not None:
+        keys.append((StatsScope.USER, user_id, task_status, priority, task_type))
+    if volunteer_id is not None:
+        keys.append((StatsScope.VOLUNTEER, volunteer_id, task_status, priority, task_type))
+    return keys
+
+
+def count_deltas(before: Iterable[TaskState] = (), after: Iterable[TaskState] = ()) -> Dict[tuple, int]:
+    """Net change per counter row for tasks moving from the `before` states to the `after` states"""
+    deltas = Counter()
+    for state in before:
+        deltas.subtract(counter_keys(state))
+    for state in after:
+        deltas.update(counter_keys(state))
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def _dialect_insert(dialect_name: str):
+    return postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+
+
+async def apply_deltas(db, deltas: Dict[tuple, int]) -> None:
+    """
+    Add per-row deltas to task_counts with one upsert.
+
+    Rows are written in key order so concurrent writers touching the same
+    counters lock them in the same order.
+    """
+    if not deltas:
+        return
+    counts = models.TaskCount.__table__
+    rows = [dict(zip(COUNT_KEY, key), count=delta) for key, delta in sorted(
+        deltas.items(), key=lambda item: tuple(str(part) for part in item[0])
+    )]
+    stmt = _dialect_insert(db.get_bind().dialect.name)(counts)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(COUNT_KEY),
+        set_={"count": counts.c.count + stmt.excluded.count}
+    )
+    await db.execute(stmt, rows)
+
+
+async def record_changes(db, before: Iterable[TaskState] = (), after: Iterable[TaskState] = ()) -> None:
+    """
+    Add the count changes for a task write to task_counts; call before commit.
+
+    The upsert runs in the caller's transaction, so the counters commit or
+    roll back together with the task rows.
+    """
+    await apply_deltas(db, count_deltas(before, after))
+
+
+async def read_stats(db, scope: StatsScope, owner_id: int) -> dict:
+    """Totals for one scope and owner, broken down by status, priority and task type"""
+    counts = models.TaskCount
+    rows = (await db.execute(
+        select(counts.status, counts.priority, counts.task_type, counts.count)
+        .where(counts.scope == scope, counts.owner_id == owner_id, counts.count != 0)
+    )).all()
+    by_status = dict.fromkeys((member.value for member in TaskStatus), 0)
+    by_priority = dict.fromkeys((member.value for member in TaskPriority), 0)
+    by_task_type = dict.fromkeys((member.value for member in TaskType), 0)
+    # Keyed by the plain labels (orjson only takes str keys); enum members hash and compare the same
+    for task_status, priority, task_type, count in rows:
+        by_status[task_status] += count
+        by_priority[priority] += count
+        by_task_type[task_type] += count
+    return {
+        "scope": scope,
+        "owner_id": owner_id if scope != StatsScope.ALL else None,
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_priority": by_priority,
+        "by_task_type": by_task_type,
+    }
+
+
+def true_counts() -> list:
+    """Per-scope selects of COUNT_KEY plus count, grouped over tasks and tasks_archive"""
+    counts = models.TaskCount.__table__
+    source = union_all(*[
+        select(*[model.__table__.c[field] for field in STATE_FIELDS])
+        for model in (models.Task, models.TaskArchive)
+    ]).subquery()
+    owners = (
+        (StatsScope.ALL, literal(0)),
+        (StatsScope.USER, source.c.user_id),
+        (StatsScope.VOLUNTEER, source.c.volunteer_id),
+    )
+    selects = []
+    for scope, owner in owners:
+        grouped = (
+            select(
+                literal(scope, type_=counts.c.scope.type).label("scope"), owner.label("owner_id"),
+                source.c.status, source.c.priority, source.c.task_type, func.count().label("count")
+            )
+            .where(
+                source.c.status.is_not(None), source.c.priority.is_not(None), source.c.task_type.is_not(None)
+            )
+            .group_by(source.c.status, source.c.priority, source.c.task_type)
+        )
+        if scope != StatsScope.ALL:
+            grouped = grouped.where(owner.is_not(None)).group_by(owner)
+        selects.append(grouped)
+    return selects
+
+
+def backfill_statements() -> list:
+    """Statements that fill an empty task_counts table from the task tables"""
+    counts = models.TaskCount.__table__
+    return [insert(counts).from_select(list(COUNT_KEY) + ["count"], grouped) for grouped in true_counts()]
+
+
+def drift_query():
+    """
+    Counter rows that disagree with the task tables, with the amount to add to each.
+
+    Recounts and current counters are compared in one statement, so both are
+    read from the same snapshot: a write committed later is in neither, and
+    its own delta lands on top of the correction.
+    """
+    counts = models.TaskCount.__table__
+    stored = select(*[counts.c[column] for column in COUNT_KEY], (-counts.c.count).label("count"))
+    combined = union_all(*true_counts(), stored).subquery()
+    keys = [combined.c[column] for column in COUNT_KEY]
+    drift = func.sum(combined.c.count)
+    return select(*keys, drift.label("drift")).group_by(*keys).having(drift != 0)
+
+
+async def reconcile_counts(db) -> int:
+    """
+    Correct drift in the incremental counters; returns the number of counter rows fixed.
+
+    Only the differences are written, as deltas, so concurrent writers are
+    never blocked for the recount and none of their updates is lost.
+    Archived tasks stay counted, so archiving never changes the counters.
+    """
+    rows = (await db.execute(drift_query())).all()
+    await apply_deltas(db, {tuple(row[:-1]): row[-1] for row in rows})
+    await db.commit()
+    return len(rows)
+
+
+async def reconcile_counts_periodically(interval: float = STATS_RECONCILE_INTERVAL) -> None:
+    """
+    Background loop that reconciles task_counts every `interval` seconds in one worker.
+
+    On Postgres each worker tries for a session advisory lock and only the
+    holder reconciles, keeping one pooled connection for the lock. The lock is
+    released if that worker or its connection goes away, and another worker
+    takes over on its next attempt.
+    """
+    while True:
+        try:
+            async with get_engine().connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    leader = (await conn.execute(
+                        text("SELECT pg_try_advisory_lock(:id)"), {"id": RECONCILE_LOCK_ID}
+                    )).scalar()
+                    await conn.commit()
+                    if not leader:
+                        await asyncio.sleep(interval)
+                        continue
+                while True:
+                    await asyncio.sleep(interval)
+                    # Fails if the lock's connection dropped, so leadership is re-established
+                    await conn.execute(text("SELECT 1"))
+                    await conn.commit()
+                    async with AsyncSessionLocal() as db:
+                        fixed = await reconcile_counts(db)
+                    logger.info("Reconciled task counts", extra={"fixed": fixed})
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Error reconciling task counts")
+            await asyncio.sleep(interval)
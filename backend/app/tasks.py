@@ -1,53 +1,297 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, load_only
+from datetime import datetime, timezone
 from typing import List, Optional
+from pydantic import ValidationError
+import base64
+import csv
+import io
+import json
+import logging
+import os
+import zlib
+from types import SimpleNamespace
 
 from app import models, schemas
-from app.database import get_db
-from app.auth import get_current_user
+from app.database import AsyncSessionLocal, get_db
+from app.enums import CLOSED_STATUSES, StatsScope, TaskPriority, TaskStatus, TaskType
+from app.auth import Principal, get_current_user
+from app.cache import CachedResponse, ResponseCache
+from app.broadcast import change_broadcast
+from app.events import task_events
+from app.serializers import ORJSONResponse, dumps, task_to_dict, tasks_to_json
+from app.log import logger
+from app.matching import ENTRY_FIELDS, matching_index
+from app.search import search_tasks
+from app.stats import STATE_FIELDS, read_stats, record_changes, task_state
 
 router = APIRouter()
 
+TASK_FIELDS = ("id", "title", "description", "priority", "status", "task_type", "user_id", "volunteer_id")
+TASK_RELATIONS = ("user", "volunteer")
+USER_FIELDS = tuple(schemas.UserResponse.model_fields)
+
+# Rows fetched per round trip when streaming an export
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# Serialized GET responses for task reads, invalidated by every task write
+response_cache = ResponseCache(
+    maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "1000")),
+    max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "30"))
+)
+
+
+def encode_cursor(task_id: int) -> str:
+    """Encode the last seen task id as an opaque pagination cursor"""
+    raw = json.dumps({"id": task_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_cursor, raising 400 if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        task_id = json.loads(base64.urlsafe_b64decode(padded.encode()))["id"]
+        if not isinstance(task_id, int):
+            raise ValueError(task_id)
+        return task_id
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def filter_tasks(
+    query,
+    task_status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    task_type: Optional[TaskType] = None,
+    user_id: Optional[int] = None,
+    volunteer_id: Optional[int] = None,
+    model=models.Task
+):
+    """Apply the optional task list filters to a Task (or TaskArchive) select"""
+    if task_status is not None:
+        query = query.filter(model.status == task_status)
+    if priority is not None:
+        query = query.filter(model.priority == priority)
+    if task_type is not None:
+        query = query.filter(model.task_type == task_type)
+    if user_id is not None:
+        query = query.filter(model.user_id == user_id)
+    if volunteer_id is not None:
+        query = query.filter(model.volunteer_id == volunteer_id)
+    return query
+
+
+def with_related_users(query, model=models.Task):
+    """Load a task's requester and volunteer in the same query as the task"""
+    return query.options(joinedload(model.user), joinedload(model.volunteer))
+
+
+def parse_projection(fields: Optional[str], expand: Optional[str]):
+    """
+    Parse the ?fields= and ?expand= query parameters.
+
+    Returns None when neither is given (full TaskOut responses), otherwise a
+    (columns, relations) pair naming the task columns and related users to
+    include in the response.
+    """
+    if fields is None and expand is None:
+        return None
+
+    columns = [f.strip() for f in fields.split(",") if f.strip()] if fields else list(TASK_FIELDS)
+    relations = [r.strip() for r in expand.split(",") if r.strip()] if expand else []
+
+    unknown = [c for c in columns if c not in TASK_FIELDS] + [r for r in relations if r not in TASK_RELATIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    if "id" not in columns:
+        columns.insert(0, "id")
+    return columns, relations
+
+
+def project_query(query, columns, relations, model=models.Task):
+    """Restrict a Task (or TaskArchive) select to the projected columns and expanded relations"""
+    options = [load_only(*[getattr(model, c) for c in columns])]
+    options += [joinedload(getattr(model, r)) for r in relations]
+    return query.options(*options)
+
+
+def project_task(task: models.Task, columns, relations) -> dict:
+    """Build a plain dict for a projected task without pydantic validation"""
+    data = {c: getattr(task, c) for c in columns}
+    for relation in relations:
+        user = getattr(task, relation)
+        data[relation] = {f: getattr(user, f) for f in USER_FIELDS} if user is not None else None
+    return data
+
+
+def cache_key(request: Request) -> tuple:
+    return request.url.path, tuple(sorted(request.query_params.multi_items()))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def cached_response(entry: CachedResponse, request: Request) -> Response:
+    """Answer from a cache entry, with 304 Not Modified when the client already has it"""
+    headers = {"ETag": entry.etag, **entry.headers}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def validation_message(error: ValidationError) -> str:
+    """Summarize a pydantic validation error on one line, as "field: message" per problem"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in error.errors()
+    )
+
+
+def status_values(new_status: TaskStatus) -> dict:
+    """Column values for moving a task to new_status: closing stamps closed_at, reopening clears it"""
+    closed_at = datetime.now(timezone.utc) if new_status in CLOSED_STATUSES else None
+    return {"status": new_status, "closed_at": closed_at}
+
+
+async def claim_pending(db: AsyncSession, candidate, volunteer_id: int):
+    """
+    Assign the pending task picked by `candidate` to a volunteer.
+
+    `candidate` selects (id, volunteer_id) of at most one pending task,
+    FOR UPDATE. Returns (task, previous volunteer_id) for the task counters,
+    or None when nothing was claimed. On Postgres this is a single
+    UPDATE ... FROM (candidate) ... RETURNING; SQLite cannot return columns
+    of the FROM clause, so there the candidate is read first (SQLite runs
+    one writer at a time, so the row cannot change in between).
+    """
+    claim = (
+        update(models.Task)
+        .values(status=TaskStatus.ACCEPTED, volunteer_id=volunteer_id)
+    )
+    if db.get_bind().dialect.name == "postgresql":
+        old = candidate.subquery("old")
+        stmt = (
+            claim.where(models.Task.id == old.c.id, models.Task.status == TaskStatus.PENDING)
+            .returning(models.Task, old.c.volunteer_id)
+        )
+        return (await db.execute(stmt)).first()
+
+    picked = (await db.execute(candidate)).first()
+    if picked is None:
+        return None
+    stmt = (
+        claim.where(models.Task.id == picked.id, models.Task.status == TaskStatus.PENDING)
+        .returning(models.Task)
+    )
+    task = (await db.execute(stmt)).scalars().first()
+    return (task, picked.volunteer_id) if task is not None else None
+
+
+async def missing_task(db: AsyncSession, task_id: int) -> HTTPException:
+    """The error for a task id not in the hot table: 409 if it has been archived, else 404"""
+    if await db.get(models.TaskArchive, task_id) is not None:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Task is archived"
+        )
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Task not found"
+    )
+
+
+def claimed_from(task: models.Task, old_volunteer_id: Optional[int]):
+    """The counted state a just-claimed task was in before the claim"""
+    return (TaskStatus.PENDING, task.priority, task.task_type, task.user_id, old_volunteer_id)
+
+
+def apply_task_change(event_type: str, task, previous_status: Optional[TaskStatus] = None) -> None:
+    """Invalidate cached reads, update the matching index and publish the change in this worker"""
+    response_cache.invalidate("tasks", f"task:{task.id}")
+    matching_index.apply(event_type, task)
+    task_events.publish(event_type, task, previous_status)
+
+
+def task_changed(event_type: str, task: models.Task, previous_status: Optional[TaskStatus] = None) -> None:
+    """Apply a task write here and in every other server worker; call after commit"""
+    apply_task_change(event_type, task, previous_status)
+    change_broadcast.publish({
+        "kind": "task",
+        "event": event_type,
+        "task": {f: getattr(task, f) for f in ENTRY_FIELDS},
+        "previous_status": previous_status,
+    })
+
+
+def invalidate_responses(*tags: str) -> None:
+    """Drop cached responses with these tags here and in every other server worker"""
+    response_cache.invalidate(*tags)
+    change_broadcast.publish({"kind": "invalidate", "tags": list(tags)})
+
+
+def apply_broadcast(message: dict) -> None:
+    """Apply a change another worker broadcast (see app.broadcast)"""
+    kind = message["kind"]
+    if kind == "task":
+        apply_task_change(message["event"], SimpleNamespace(**message["task"]), message.get("previous_status"))
+    elif kind == "invalidate":
+        response_cache.invalidate(*message["tags"])
+    elif kind == "resync":
+        # Changes may have been missed; the matching index catches up on its next rebuild
+        response_cache.clear()
+
+
 # Create task endpoint - simplified for testing (no auth required)
 @router.post("/", response_model=schemas.TaskOut)
-def create_task(
+async def create_task(
     task: schemas.TaskCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Create a new task request without authentication (for testing)
     """
     try:
-        print(f"Received task data: {task.model_dump()}")
-
-        valid_priorities = ["low", "medium", "high"]
-        if task.priority.lower() not in valid_priorities:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Priority must be one of: {', '.join(valid_priorities)}"
-            )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received task data", extra={"task": task.model_dump()})
 
         db_task = models.Task(
             title=task.title,
             description=task.description,
-            priority=task.priority.lower(),
-            status="pending",
+            priority=task.priority,
+            status=TaskStatus.PENDING,
             task_type=task.task_type,
             user_id=1  # Use default user ID for testing
         )
 
         db.add(db_task)
-        db.commit()
-        db.refresh(db_task)
+        await record_changes(db, after=[task_state(db_task)])
+        await db.commit()
+        await db.refresh(db_task, ["user", "volunteer"])
 
-        print(f"Task created successfully with ID: {db_task.id}")
+        task_changed("task.created", db_task)
+        logger.info("Task created", extra={"task_id": db_task.id})
         return db_task
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error creating task: {str(e)}")
-        db.rollback()
+        logger.exception("Error creating task")
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create task: {str(e)}"
@@ -56,64 +300,240 @@ def create_task(
 
 # Create task endpoint with authentication
 @router.post("/authenticated", response_model=schemas.TaskOut)
-def create_authenticated_task(
+async def create_authenticated_task(
     task: schemas.TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Create a new task request with user authentication
     """
     try:
-        print(f"Authenticated user {current_user.id} creating task: {task.model_dump()}")
-
-        valid_priorities = ["low", "medium", "high"]
-        if task.priority.lower() not in valid_priorities:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Priority must be one of: {', '.join(valid_priorities)}"
-            )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received task data", extra={"user_id": current_user.id, "task": task.model_dump()})
 
         db_task = models.Task(
             title=task.title,
             description=task.description,
-            priority=task.priority.lower(),
-            status="pending",
+            priority=task.priority,
+            status=TaskStatus.PENDING,
             task_type=task.task_type,
             user_id=current_user.id
         )
 
         db.add(db_task)
-        db.commit()
-        db.refresh(db_task)
+        await record_changes(db, after=[task_state(db_task)])
+        await db.commit()
+        await db.refresh(db_task, ["user", "volunteer"])
 
-        print(f"Authenticated task created successfully with ID: {db_task.id}")
+        task_changed("task.created", db_task)
+        logger.info("Task created", extra={"task_id": db_task.id, "user_id": current_user.id})
         return db_task
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error creating authenticated task: {str(e)}")
-        db.rollback()
+        logger.exception("Error creating authenticated task")
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create task: {str(e)}"
         )
 
 
-@router.get("/", response_model=List[schemas.TaskOut])
-def get_all_tasks(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100
+@router.post("/bulk", response_model=schemas.BulkResponse)
+async def create_tasks_bulk(
+    payload: schemas.TaskBulkCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Get all tasks (for admin/volunteer view)"""
+    """
+    Create a batch of tasks for the authenticated user in one transaction
+
+    Invalid items are reported in the per-item results and skipped; the valid
+    ones are written with a single multi-row INSERT ... RETURNING.
+    """
     try:
-        tasks = db.query(models.Task).offset(skip).limit(limit).all()
-        print(f"Retrieved {len(tasks)} tasks")
-        return tasks
+        results = []
+        rows = []
+        for index, item in enumerate(payload.tasks):
+            try:
+                task = schemas.TaskCreate.model_validate(item)
+            except ValidationError as e:
+                results.append(schemas.BulkItemResult(index=index, ok=False, error=validation_message(e)))
+                continue
+            results.append(schemas.BulkItemResult(index=index, ok=True))
+            rows.append({
+                "title": task.title,
+                "description": task.description,
+                "priority": task.priority,
+                "status": TaskStatus.PENDING,
+                "task_type": task.task_type,
+                "user_id": current_user.id,
+            })
+
+        created = []
+        if rows:
+            stmt = insert(models.Task).returning(models.Task, sort_by_parameter_order=True)
+            created = (await db.execute(stmt, rows)).scalars().all()
+            await record_changes(db, after=[task_state(t) for t in created])
+            await db.commit()
+
+        created_iter = iter(created)
+        for result in results:
+            if result.ok:
+                result.task_id = next(created_iter).id
+        for db_task in created:
+            task_changed("task.created", db_task)
+
+        logger.info("Bulk tasks created", extra={"created_count": len(created), "submitted": len(results), "user_id": current_user.id})
+        return schemas.BulkResponse(
+            message=f"Created {len(created)} tasks",
+            succeeded=len(created),
+            failed=len(results) - len(created),
+            results=results
+        )
+
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error retrieving tasks: {str(e)}")
+        logger.exception("Error bulk creating tasks")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to create tasks: {str(e)}"
+        )
+
+
+@router.put("/bulk/status", response_model=schemas.BulkResponse)
+async def update_task_status_bulk(
+    payload: schemas.TaskBulkStatusUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Move a batch of tasks to a new status with one set-based UPDATE"""
+    try:
+        values = status_values(payload.status)
+        if payload.status == TaskStatus.ACCEPTED:
+            values["volunteer_id"] = current_user.id
+
+        task_ids = set(payload.task_ids)
+        # Lock the rows and read their old state for the counters before changing them
+        before = (await db.execute(
+            select(models.Task.id, *[getattr(models.Task, field) for field in STATE_FIELDS])
+            .where(models.Task.id.in_(task_ids))
+            .with_for_update()
+        )).all()
+        previous_status = {row.id: row.status for row in before}
+        stmt = (
+            update(models.Task)
+            .where(models.Task.id.in_(task_ids))
+            .values(**values)
+            .returning(models.Task)
+        )
+        updated = {t.id: t for t in (await db.execute(stmt)).scalars().all()}
+        await record_changes(db, before=[tuple(row[1:]) for row in before], after=[task_state(t) for t in updated.values()])
+        await db.commit()
+
+        for db_task in updated.values():
+            task_changed("task.updated", db_task, previous_status.get(db_task.id))
+
+        results = [
+            schemas.BulkItemResult(index=index, ok=True, task_id=task_id)
+            if task_id in updated else
+            schemas.BulkItemResult(index=index, ok=False, task_id=task_id, error="Task not found")
+            for index, task_id in enumerate(payload.task_ids)
+        ]
+        succeeded = sum(1 for r in results if r.ok)
+
+        logger.info("Bulk task status updated", extra={"updated": len(updated), "new_status": payload.status})
+        return schemas.BulkResponse(
+            message=f"Task status updated to {payload.status}",
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            results=results
+        )
+
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error bulk updating task status")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update task status"
+        )
+
+
+@router.get("/", response_model=List[schemas.TaskOut])
+async def get_all_tasks(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    after: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    task_status: Optional[TaskStatus] = Query(None, alias="status"),
+    priority: Optional[TaskPriority] = None,
+    task_type: Optional[TaskType] = None,
+    user_id: Optional[int] = None,
+    volunteer_id: Optional[int] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated task columns to return"),
+    expand: Optional[str] = Query(None, description="Comma-separated related users to include: user, volunteer")
+):
+    """
+    Get all tasks (for admin/volunteer view)
+
+    Tasks are returned in id order. When a full page is returned the
+    X-Next-Cursor response header carries a cursor for the next page; pass it
+    back as ?after= to seek straight past the previous page instead of using
+    an offset.
+
+    Passing ?fields= or ?expand= switches to a lean projection: only the
+    requested columns are selected and related users are joined only when
+    expanded.
+
+    Responses carry a strong ETag and are served from the response cache
+    until a task write invalidates them; If-None-Match gets 304.
+    """
+    try:
+        key = cache_key(request)
+        entry = response_cache.get(key)
+        if entry is not None:
+            return cached_response(entry, request)
+        generation = response_cache.generation
+
+        projection = parse_projection(fields, expand)
+        query = filter_tasks(
+            select(models.Task),
+            task_status=task_status,
+            priority=priority,
+            task_type=task_type,
+            user_id=user_id,
+            volunteer_id=volunteer_id
+        )
+        query = query.order_by(models.Task.id)
+        if after is not None:
+            query = query.filter(models.Task.id > decode_cursor(after))
+        else:
+            query = query.offset(skip)
+        query = project_query(query, *projection) if projection else with_related_users(query)
+
+        tasks = (await db.execute(query.limit(limit))).scalars().all()
+        headers = {}
+        if len(tasks) == limit:
+            headers["X-Next-Cursor"] = encode_cursor(tasks[-1].id)
+
+        logger.debug("Retrieved tasks", extra={"count": len(tasks)})
+        if projection:
+            body = dumps([project_task(t, *projection) for t in tasks])
+        else:
+            body = tasks_to_json(tasks)
+        entry = response_cache.set(key, body, tags=("tasks",), headers=headers, generation=generation)
+        return cached_response(entry, request)
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error retrieving tasks")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve tasks"
@@ -121,78 +541,407 @@ def get_all_tasks(
 
 
 @router.get("/my-tasks", response_model=List[schemas.TaskOut])
-def get_user_tasks(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+async def get_user_tasks(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    fields: Optional[str] = Query(None, description="Comma-separated task columns to return"),
+    expand: Optional[str] = Query(None, description="Comma-separated related users to include: user, volunteer")
 ):
     """Get tasks for the authenticated user"""
     try:
-        tasks = db.query(models.Task).filter(models.Task.user_id == current_user.id).all()
-        print(f"Retrieved {len(tasks)} tasks for user {current_user.id}")
-        return tasks
-    except Exception as e:
-        print(f"Error retrieving user tasks: {str(e)}")
+        projection = parse_projection(fields, expand)
+        query = select(models.Task).filter(models.Task.user_id == current_user.id)
+        query = project_query(query, *projection) if projection else with_related_users(query)
+
+        tasks = (await db.execute(query)).scalars().all()
+        logger.debug("Retrieved user tasks", extra={"count": len(tasks), "user_id": current_user.id})
+        if projection:
+            return ORJSONResponse(content=[project_task(t, *projection) for t in tasks])
+        return Response(content=tasks_to_json(tasks), media_type="application/json")
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error retrieving user tasks")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve user tasks"
         )
 
 
+@router.get("/stream")
+async def stream_task_events(
+    task_status: Optional[TaskStatus] = Query(None, alias="status"),
+    task_type: Optional[TaskType] = None,
+    last_event_id: Optional[int] = Query(None, description="Resume after this event id"),
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Server-Sent Events feed of task changes (task.created, task.updated, task.deleted)
+
+    Events can be filtered by status and task_type. A status filter also
+    gets the events of tasks leaving that status; each event carries the
+    previous_status the task moved from. Reconnecting clients
+    resume from the Last-Event-ID header (or ?last_event_id=). A
+    "reconnect" event means the client fell behind and should reconnect with
+    its last event id; "reset" means the missed events are gone and the task
+    list should be refetched.
+    """
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+    sub = task_events.subscribe(task_status=task_status, task_type=task_type, last_event_id=resume_from)
+    return StreamingResponse(
+        task_events.stream(sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def export_task_rows(export_format: str, compress: bool, filters: dict):
+    """
+    Yield an export of the tasks table, archived tasks included, chunk by chunk.
+
+    Rows come from a server-side cursor EXPORT_BATCH_SIZE at a time, so memory
+    stays flat however many tasks there are. The generator opens its own
+    session because it keeps running after the route handler has returned.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+
+    def encode(chunk: bytes) -> bytes:
+        if compressor is None:
+            return chunk
+        return compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    if export_format == "csv":
+        yield encode((",".join(TASK_FIELDS) + "\r\n").encode())
+
+    # Hot and archived tasks together, in id order
+    query = union_all(*[
+        filter_tasks(select(*[getattr(model, c) for c in TASK_FIELDS]), model=model, **filters)
+        for model in (models.Task, models.TaskArchive)
+    ])
+    query = query.order_by(query.selected_columns.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions():
+            if export_format == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                chunk = buffer.getvalue().encode()
+            else:
+                chunk = b"".join(dumps(dict(zip(TASK_FIELDS, row))) + b"\n" for row in rows)
+            yield encode(chunk)
+
+    if compressor is not None:
+        yield compressor.flush()
+
+
+@router.get("/export")
+async def export_tasks(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    gzip: bool = Query(False, description="gzip the stream (sent with Content-Encoding: gzip)"),
+    task_status: Optional[TaskStatus] = Query(None, alias="status"),
+    priority: Optional[TaskPriority] = None,
+    task_type: Optional[TaskType] = None,
+    user_id: Optional[int] = None,
+    volunteer_id: Optional[int] = None
+):
+    """Stream every matching task, archived ones included, as NDJSON or CSV, taking the same filters as the task list"""
+    filters = {
+        "task_status": task_status,
+        "priority": priority,
+        "task_type": task_type,
+        "user_id": user_id,
+        "volunteer_id": volunteer_id,
+    }
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f"attachment; filename=tasks.{export_format}"}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+
+    logger.info("Task export started", extra={"format": export_format, "gzip": gzip})
+    return StreamingResponse(
+        export_task_rows(export_format, gzip, filters),
+        media_type=media_type,
+        headers=headers
+    )
+
+
+@router.get("/recommended", response_model=List[schemas.TaskOut])
+async def get_recommended_tasks(
+    current_user: Principal = Depends(get_current_user),
+    limit: int = Query(10, ge=1, le=100),
+    task_type: Optional[TaskType] = None
+):
+    """
+    Open tasks ranked for the current volunteer
+
+    Served from the in-memory matching index: priorities are ordered by the
+    volunteer's experience and tasks waiting longest come first. The
+    volunteer's own requests are left out.
+    """
+    tasks = matching_index.recommend(current_user.id, current_user.experience, limit=limit, task_type=task_type)
+    return ORJSONResponse(content=tasks)
+
+
+@router.get("/stats", response_model=schemas.TaskStats)
+async def get_task_stats(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    scope: StatsScope = StatsScope.ALL,
+    owner_id: Optional[int] = Query(None, description="Requester or volunteer to count for; defaults to the current user")
+):
+    """
+    Task counts by status, priority and task type
+
+    scope=all counts every task, scope=user the tasks a requester created and
+    scope=volunteer the tasks assigned to a volunteer. Read from task_counts,
+    which the write paths keep up to date, so the cost does not grow with
+    the number of tasks.
+    """
+    try:
+        if scope == StatsScope.ALL:
+            owner_id = 0
+        elif owner_id is None:
+            owner_id = current_user.id
+        elif owner_id != current_user.id and current_user.role != "admin":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="You can only view your own task statistics"
+            )
+        return ORJSONResponse(content=await read_stats(db, scope, owner_id))
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error reading task statistics")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to read task statistics"
+        )
+
+
+@router.get("/search", response_model=List[schemas.TaskSearchResult])
+async def search(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200, description="Words to look for in task titles and descriptions"),
+    db: AsyncSession = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    task_status: Optional[TaskStatus] = Query(None, alias="status"),
+    task_type: Optional[TaskType] = None
+):
+    """
+    Full-text search over task titles and descriptions
+
+    Backed by a GIN-indexed tsvector on Postgres and FTS5 on SQLite, so cost
+    follows the number of matches rather than the size of the table. Results
+    are ordered by relevance, title matches first, and paged with skip/limit.
+    Cached with an ETag like the task list.
+    """
+    try:
+        key = cache_key(request)
+        entry = response_cache.get(key)
+        if entry is not None:
+            return cached_response(entry, request)
+        generation = response_cache.generation
+
+        results = await search_tasks(db, q, skip=skip, limit=limit, task_status=task_status, task_type=task_type)
+        logger.debug("Searched tasks", extra={"count": len(results)})
+        entry = response_cache.set(key, dumps(results), tags=("tasks",), generation=generation)
+        return cached_response(entry, request)
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error searching tasks")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search tasks"
+        )
+
+
 @router.get("/{task_id}", response_model=schemas.TaskOut)
-def get_task(
+async def get_task(
     task_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    fields: Optional[str] = Query(None, description="Comma-separated task columns to return"),
+    expand: Optional[str] = Query(None, description="Comma-separated related users to include: user, volunteer")
 ):
-    """Get a specific task by ID"""
+    """Get a specific task by ID, reading through to the archive (cached with an ETag like the task list)"""
     try:
-        task = db.query(models.Task).filter(models.Task.id == task_id).first()
+        key = cache_key(request)
+        entry = response_cache.get(key)
+        if entry is not None:
+            return cached_response(entry, request)
+        generation = response_cache.generation
+
+        projection = parse_projection(fields, expand)
+        task = None
+        # Hot table first, then closed tasks that have been archived
+        for model in (models.Task, models.TaskArchive):
+            query = select(model).filter(model.id == task_id)
+            query = project_query(query, *projection, model=model) if projection else with_related_users(query, model)
+            task = (await db.execute(query)).scalars().first()
+            if task is not None:
+                break
         if not task:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Task not found"
             )
-        return task
+        if projection:
+            body = dumps(project_task(task, *projection))
+        else:
+            body = dumps(task_to_dict(task))
+        # Tagged with the embedded users too, so a profile change drops the entry
+        embedded = TASK_RELATIONS if not projection else projection[1]
+        users = {getattr(task, relation) for relation in embedded} - {None}
+        tags = (f"task:{task_id}",) + tuple(f"user:{user.id}" for user in users)
+        entry = response_cache.set(key, body, tags=tags, generation=generation)
+        return cached_response(entry, request)
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Error retrieving task {task_id}: {str(e)}")
+    except Exception:
+        logger.exception("Error retrieving task", extra={"task_id": task_id})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to retrieve task"
         )
 
 
-@router.put("/{task_id}/status")
-def update_task_status(
-    task_id: int,
-    new_status: str,
-    db: Session = Depends(get_db),
-    current_user: Optional[models.User] = Depends(get_current_user)
+@router.post("/claim-next")
+async def claim_next_task(
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user),
+    priority: Optional[TaskPriority] = None,
+    task_type: Optional[TaskType] = None
 ):
-    """Update task status (for volunteers)"""
+    """
+    Claim the oldest pending task matching the filters (for volunteers)
+
+    The candidate row is picked with FOR UPDATE SKIP LOCKED inside the same
+    UPDATE that claims it, so concurrent volunteers each get a different task
+    instead of queueing on the same row.
+    """
     try:
-        task = db.query(models.Task).filter(models.Task.id == task_id).first()
-        if not task:
+        candidate = (
+            filter_tasks(
+                select(models.Task.id, models.Task.volunteer_id),
+                task_status=TaskStatus.PENDING, priority=priority, task_type=task_type
+            )
+            # Never hand volunteers their own requests, as /recommended doesn't; unowned tasks stay claimable
+            .where(models.Task.user_id.is_distinct_from(current_user.id))
+            .order_by(models.Task.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        claimed = await claim_pending(db, candidate, current_user.id)
+        if claimed is None:
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found"
+                detail="No pending task matches"
             )
+        task, old_volunteer_id = claimed
+        await record_changes(db, before=[claimed_from(task, old_volunteer_id)], after=[task_state(task)])
+        await db.commit()
+        task_changed("task.updated", task, TaskStatus.PENDING)
+
+        logger.info("Task claimed", extra={"task_id": task.id, "volunteer_id": current_user.id})
+        return {
+            "message": "Task claimed",
+            "task_id": task.id,
+            "new_status": task.status,
+            "volunteer_id": task.volunteer_id
+        }
+
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error claiming next task")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to claim task"
+        )
+
+
+@router.post("/{task_id}/claim")
+async def claim_task(
+    task_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Claim a pending task for the current volunteer (pending -> accepted)
 
-        valid_statuses = ["pending", "accepted", "in_progress", "completed", "cancelled"]
-        if new_status not in valid_statuses:
+    The check and the assignment happen in one conditional UPDATE, so when
+    several volunteers race for the same task exactly one wins and the rest
+    get 409 Conflict.
+    """
+    try:
+        candidate = (
+            select(models.Task.id, models.Task.volunteer_id)
+            .where(models.Task.id == task_id, models.Task.status == TaskStatus.PENDING)
+            .with_for_update()
+        )
+        claimed = await claim_pending(db, candidate, current_user.id)
+        if claimed is None:
+            await db.rollback()
+            if await db.get(models.Task, task_id) is None:
+                raise await missing_task(db, task_id)
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Status must be one of: {', '.join(valid_statuses)}"
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Task has already been claimed"
             )
+        task, old_volunteer_id = claimed
+        await record_changes(db, before=[claimed_from(task, old_volunteer_id)], after=[task_state(task)])
+        await db.commit()
+        task_changed("task.updated", task, TaskStatus.PENDING)
+
+        logger.info("Task claimed", extra={"task_id": task_id, "volunteer_id": current_user.id})
+        return {
+            "message": "Task claimed",
+            "task_id": task_id,
+            "new_status": task.status,
+            "volunteer_id": task.volunteer_id
+        }
+
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error claiming task", extra={"task_id": task_id})
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to claim task"
+        )
 
-        task.status = new_status
+
+@router.put("/{task_id}/status")
+async def update_task_status(
+    task_id: int,
+    new_status: TaskStatus,
+    db: AsyncSession = Depends(get_db),
+    current_user: Optional[Principal] = Depends(get_current_user)
+):
+    """Update task status (for volunteers)"""
+    try:
+        task = await db.get(models.Task, task_id, with_for_update=True)
+        if not task:
+            raise await missing_task(db, task_id)
+        before = task_state(task)
+
+        for column, value in status_values(new_status).items():
+            setattr(task, column, value)
 
         # ✅ Assign volunteer if status is accepted and user is logged in
-        if new_status == "accepted" and current_user:
+        if new_status == TaskStatus.ACCEPTED and current_user:
             task.volunteer_id = current_user.id
 
-        db.commit()
-        print(f"Task {task_id} status updated to {new_status}")
+        await record_changes(db, before=[before], after=[task_state(task)])
+        await db.commit()
+        task_changed("task.updated", task, before[0])
+        logger.info("Task status updated", extra={"task_id": task_id, "new_status": new_status})
 
         return {
             "message": f"Task status updated to {new_status}",
@@ -202,9 +951,9 @@ def update_task_status(
 
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Error updating task status: {str(e)}")
-        db.rollback()
+    except Exception:
+        logger.exception("Error updating task status")
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update task status"
@@ -212,19 +961,16 @@ def update_task_status(
 
 
 @router.delete("/{task_id}")
-def delete_task(
+async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """Delete a task (only by the task creator)"""
     try:
-        task = db.query(models.Task).filter(models.Task.id == task_id).first()
+        task = await db.get(models.Task, task_id, with_for_update=True)
         if not task:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found"
-            )
+            raise await missing_task(db, task_id)
 
         if task.user_id != current_user.id and current_user.role != "admin":
             raise HTTPException(
@@ -232,16 +978,18 @@ def delete_task(
                 detail="You can only delete your own tasks"
             )
 
-        db.delete(task)
-        db.commit()
+        await db.delete(task)
+        await record_changes(db, before=[task_state(task)])
+        await db.commit()
+        task_changed("task.deleted", task)
 
         return {"message": f"Task {task_id} deleted successfully"}
 
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"Error deleting task: {str(e)}")
-        db.rollback()
+    except Exception:
+        logger.exception("Error deleting task")
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete task"
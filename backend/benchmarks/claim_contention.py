@@ -0,0 +1,110 @@
+"""
+Task claim contention check.
+
+Fires many concurrent claims at the same pending task and verifies that
+exactly one volunteer wins and every other request gets 409. It then lets
+all volunteers drain a pool of tasks through /claim-next and verifies that
+every task is claimed exactly once. Exits non-zero if either check fails.
+
+Runs in-process against a throwaway SQLite database unless DATABASE_URL is
+set. Run from the backend directory:
+
+    python -m benchmarks.claim_contention --volunteers 50 --trials 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/claim_contention.db"
+# All simulated volunteers share one client address
+os.environ.setdefault("RATE_LIMITS_ENABLED", "false")
+os.environ.setdefault("APP_ENV", "development")
+
+import httpx  # noqa: E402
+
+from app import models  # noqa: E402
+from app.auth import create_access_token  # noqa: E402
+from app.database import AsyncSessionLocal, dispose_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.migrate import migrate  # noqa: E402
+
+
+async def seed(volunteers: int, tasks: int):
+    await migrate()
+    async with AsyncSessionLocal() as db:
+        users = [
+            models.User(full_name=f"Volunteer {i}", email=f"volunteer{i}@example.com", password="x",
+                        dob=date(2000, 1, 1), gender="Other", role="volunteer")
+            for i in range(volunteers)
+        ]
+        db.add_all(users)
+        db.add_all([
+            models.Task(title=f"Task {i}", description="Contention check", priority="medium",
+                        status="pending", task_type="Companionship")
+            for i in range(tasks)
+        ])
+        await db.commit()
+        return [create_access_token(u) for u in users]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--volunteers", type=int, default=50, help="concurrent claimers")
+    parser.add_argument("--trials", type=int, default=20, help="tasks raced for one at a time")
+    parser.add_argument("--pool", type=int, default=200, help="tasks drained through /claim-next")
+    args = parser.parse_args()
+
+    tokens = await seed(args.volunteers, args.trials + args.pool)
+    transport = httpx.ASGITransport(app=app)
+    failures = []
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        def claim(path, token):
+            return client.post(path, headers={"Authorization": f"Bearer {token}"})
+
+        start = time.perf_counter()
+        for task_id in range(1, args.trials + 1):
+            responses = await asyncio.gather(*[claim(f"/api/tasks/{task_id}/claim", t) for t in tokens])
+            codes = sorted(r.status_code for r in responses)
+            if codes.count(200) != 1 or codes.count(409) != len(tokens) - 1:
+                failures.append({"task_id": task_id, "status_codes": codes})
+        race_seconds = time.perf_counter() - start
+
+        async def drain(token):
+            won = []
+            while True:
+                r = await claim("/api/tasks/claim-next", token)
+                if r.status_code != 200:
+                    return won, r.status_code
+                won.append(r.json()["task_id"])
+
+        start = time.perf_counter()
+        drained = await asyncio.gather(*[drain(t) for t in tokens])
+        drain_seconds = time.perf_counter() - start
+
+    claimed = [task_id for won, _ in drained for task_id in won]
+    if len(claimed) != len(set(claimed)) or len(claimed) != args.pool:
+        failures.append({"claim_next": "tasks claimed more than once or left unclaimed", "claimed": len(claimed)})
+    if any(code != 404 for _, code in drained):
+        failures.append({"claim_next": "unexpected final status", "codes": sorted({c for _, c in drained})})
+
+    print(json.dumps({
+        "volunteers": args.volunteers,
+        "race_trials": args.trials,
+        "race_claims_per_sec": round(args.trials * args.volunteers / race_seconds, 1),
+        "claim_next_tasks": len(claimed),
+        "claim_next_per_sec": round(len(claimed) / drain_seconds, 1),
+        "failures": failures,
+    }, indent=2))
+    await dispose_engine()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,291 @@
+"""
+HTTP load test for the AbleMate API.
+
+Boots app.main:app under uvicorn in a subprocess against a throwaway SQLite
+database (or DATABASE_URL, e.g. a disposable local Postgres), seeds users and
+tasks, then runs concurrent virtual users. Each one registers and logs in,
+then loops create -> list -> get -> status update -> delete until the run
+ends. Prints a JSON report with throughput and p50/p95/p99 latency per
+endpoint.
+
+With --baseline the report is compared against a stored one: an endpoint
+regresses when its p95 or p99 grows, or its throughput falls, by more than
+--threshold. Regressions are listed in the report and the exit status is 1.
+--save-baseline writes the report as the new baseline instead.
+
+Run from the backend directory:
+
+    python -m benchmarks.loadtest --concurrency 20 --duration 30
+    python -m benchmarks.loadtest --save-baseline benchmarks/baseline.json
+    python -m benchmarks.loadtest --baseline benchmarks/baseline.json --threshold 0.25
+
+--url points the clients at an already running server and skips booting and
+seeding.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date
+from typing import Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PASSWORD = "loadtest-password"
+
+TASK_TYPES = (
+    "Grocery Shopping", "House Cleaning", "Companionship", "Transportation", "Meal Preparation",
+    "Medication Reminders", "Helping with Exercises", "Monitoring Health Conditions",
+    "Assisting with Doctor Visits",
+)
+PRIORITIES = ("low", "medium", "high")
+SEED_STATUSES = ("pending",) * 6 + ("accepted", "in_progress", "completed", "cancelled")
+DESCRIPTIONS = (
+    "Weekly grocery run to the corner shop, list will be by the door",
+    "Help tidying the kitchen and taking the bins out",
+    "A chat and a cup of tea in the afternoon",
+    "Lift to the clinic for a 10am appointment and back",
+    "Prepare a simple lunch that can be reheated later",
+    "Reminder call for evening medication",
+)
+
+# Latency metrics compared against the baseline, and throughput
+LATENCY_KEYS = ("p95_ms", "p99_ms")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def seed(users: int, tasks: int) -> None:
+    """Migrate the schema and bulk insert users and tasks through the app's own engine"""
+    from app import models
+    from app.database import AsyncSessionLocal, dispose_engine
+    from app.migrate import migrate
+    from app.passwords import password_hasher
+
+    await migrate()
+    hashed = await password_hasher.hash(PASSWORD)
+    password_hasher.shutdown()
+
+    rng = random.Random(42)
+    async with AsyncSessionLocal() as db:
+        db.add_all([
+            models.User(full_name=f"Seed User {i}", email=f"seed{i}@example.com", password=hashed,
+                        dob=date(1950, 1, 1), gender=rng.choice(("Male", "Female", "Other")),
+                        role="dependent" if i % 2 else "volunteer",
+                        experience=None if i % 2 else f"{rng.randint(0, 36)} months")
+            for i in range(users)
+        ])
+        await db.flush()
+        db.add_all([
+            models.Task(title=f"{task_type} #{i}", description=rng.choice(DESCRIPTIONS),
+                        priority=rng.choice(PRIORITIES), status=rng.choice(SEED_STATUSES),
+                        task_type=task_type, user_id=rng.randint(1, users))
+            for i, task_type in ((i, rng.choice(TASK_TYPES)) for i in range(tasks))
+        ])
+        await db.commit()
+    await dispose_engine()
+
+
+def start_server(port: int, env: dict, workers: int) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+    ]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL)
+
+
+async def wait_until_healthy(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become healthy within {timeout}s")
+
+
+class Recorder:
+    """Per-endpoint latencies and error counts"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    async def call(self, name: str, request) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            response = None
+        self.latencies.setdefault(name, []).append(time.perf_counter() - start)
+        if response is None or response.status_code >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return None
+        return response
+
+
+async def virtual_user(client: httpx.AsyncClient, recorder: Recorder, deadline: float, rng: random.Random) -> None:
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    registered = await recorder.call("register", client.post("/api/auth/register", json={
+        "full_name": "Load Test", "email": email, "password": PASSWORD, "confirm_password": PASSWORD,
+        "dob": "1990-01-01", "gender": "Other", "role": "dependent",
+    }))
+    if registered is None:
+        return
+    login = await recorder.call("login", client.post("/api/auth/login", json={"email": email, "password": PASSWORD}))
+    if login is None:
+        return
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    while time.perf_counter() < deadline:
+        created = await recorder.call("create", client.post("/api/tasks/authenticated", headers=headers, json={
+            "title": "Load test task", "description": rng.choice(DESCRIPTIONS),
+            "priority": rng.choice(PRIORITIES), "task_type": rng.choice(TASK_TYPES),
+        }))
+        await recorder.call("list", client.get("/api/tasks/", params={"status": "pending", "limit": 50}))
+        if created is None:
+            continue
+        task_id = created.json()["id"]
+        await recorder.call("get", client.get(f"/api/tasks/{task_id}"))
+        await recorder.call("status_update", client.put(
+            f"/api/tasks/{task_id}/status", params={"new_status": "in_progress"}, headers=headers
+        ))
+        await recorder.call("delete", client.delete(f"/api/tasks/{task_id}", headers=headers))
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    endpoints = {}
+    for name, latencies in recorder.latencies.items():
+        latencies = sorted(latencies)
+        endpoints[name] = {
+            "count": len(latencies),
+            "errors": recorder.errors.get(name, 0),
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        }
+    total = sum(e["count"] for e in endpoints.values())
+    return {
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "errors": sum(recorder.errors.values()),
+        "throughput_rps": round(total / elapsed, 2),
+        "endpoints": endpoints,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> List[dict]:
+    """Endpoints whose latency or throughput is worse than the baseline by more than threshold"""
+    regressions = []
+    for name, base in baseline.get("endpoints", {}).items():
+        current = report["endpoints"].get(name)
+        if current is None:
+            regressions.append({"endpoint": name, "metric": "missing"})
+            continue
+        for key in LATENCY_KEYS:
+            if base[key] > 0 and current[key] > base[key] * (1 + threshold):
+                regressions.append({"endpoint": name, "metric": key, "baseline": base[key], "current": current[key]})
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            regressions.append({"endpoint": name, "metric": "throughput_rps",
+                                "baseline": base["throughput_rps"], "current": current["throughput_rps"]})
+    return regressions
+
+
+async def run_load(base_url: str, concurrency: int, duration: float, seed_value: int) -> dict:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*[
+            virtual_user(client, recorder, deadline, random.Random(seed_value + i)) for i in range(concurrency)
+        ])
+        elapsed = time.perf_counter() - start
+    return summarize(recorder, elapsed)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20, help="virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load per run")
+    parser.add_argument("--users", type=int, default=200, help="seeded users")
+    parser.add_argument("--tasks", type=int, default=5000, help="seeded tasks")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--seed", type=int, default=1, help="random seed for the request mix")
+    parser.add_argument("--url", help="load an already running server instead of booting one")
+    parser.add_argument("--baseline", help="baseline report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression, as a fraction")
+    parser.add_argument("--save-baseline", help="write this run's report to the given path")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        # Every virtual user shares one address, so per-IP limits would cap the test itself
+        env = dict(os.environ, LOG_LEVEL="WARNING", MIGRATE_ON_STARTUP="false", RATE_LIMITS_ENABLED="false")
+        env.setdefault("APP_ENV", "development")
+        env.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/loadtest.db")
+        os.environ["DATABASE_URL"] = env["DATABASE_URL"]
+        await seed(args.users, args.tasks)
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = start_server(port, env, args.workers)
+
+    try:
+        await wait_until_healthy(base_url)
+        report = await run_load(base_url, args.concurrency, args.duration, args.seed)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report["config"] = {
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "workers": args.workers,
+        "seeded_users": args.users,
+        "seeded_tasks": args.tasks,
+        "database": "external" if args.url else os.environ["DATABASE_URL"].split(":", 1)[0],
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["threshold"] = args.threshold
+        report["regressions"] = compare(report, baseline, args.threshold)
+        exit_code = 1 if report["regressions"] else 0
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    print(json.dumps(report, indent=2))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,57 @@
+"""
+Password hashing throughput benchmark.
+
+Measures how many logins per second the PasswordHasher can verify with one
+worker process and with one worker per core, at the configured cost factor.
+
+Run from the backend directory:
+
+    python -m benchmarks.password_hashing --rounds 12 --logins 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from app.passwords import PasswordHasher
+
+
+async def measure(workers: int, rounds: int, logins: int) -> dict:
+    hasher = PasswordHasher(rounds=rounds, workers=workers, concurrency=workers, max_queue=logins)
+    try:
+        hashed = await hasher.hash("correct horse battery staple")
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *[hasher.verify("correct horse battery staple", hashed) for _ in range(logins)]
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        hasher.shutdown()
+
+    assert all(valid for valid, _ in results)
+    return {
+        "workers": workers,
+        "rounds": rounds,
+        "logins": logins,
+        "seconds": round(elapsed, 3),
+        "logins_per_sec": round(logins / elapsed, 1),
+        "logins_per_sec_per_core": round(logins / elapsed / workers, 1),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor")
+    parser.add_argument("--logins", type=int, default=200, help="verifications per run")
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    runs = [await measure(1, args.rounds, args.logins)]
+    if cores > 1:
+        runs.append(await measure(cores, args.rounds, args.logins))
+    print(json.dumps(runs, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
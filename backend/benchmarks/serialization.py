@@ -0,0 +1,82 @@
+"""
+Task list serialization micro-benchmark.
+
+Compares rows/sec for turning loaded Task rows (with requester and volunteer)
+into a JSON response body:
+
+  response_model  the default FastAPI path: TaskOut validation,
+                  jsonable_encoder, then the stdlib json encoder
+  pydantic_json   TaskOut validation then pydantic's dump_json
+  fast_path       app.serializers.tasks_to_json (no re-validation, orjson)
+
+Run from the backend directory:
+
+    python -m benchmarks.serialization --rows 1000 --repeat 20
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date
+from typing import List
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from app import models, schemas  # noqa: E402
+from app.serializers import orjson, tasks_to_json  # noqa: E402
+
+TASK_LIST = TypeAdapter(List[schemas.TaskOut])
+
+
+def make_tasks(rows: int) -> list:
+    requester = models.User(id=1, full_name="Requester", email="requester@example.com", password="x",
+                            dob=date(1950, 3, 4), gender="Female", role="dependent", disability_status="Visual")
+    volunteer = models.User(id=2, full_name="Volunteer", email="volunteer@example.com", password="x",
+                            dob=date(1999, 5, 6), gender="Male", role="volunteer", experience="6 months")
+    return [
+        models.Task(id=i, title=f"Task {i}", description="Weekly grocery run to the corner shop",
+                    priority="medium", status="accepted", task_type="Grocery Shopping",
+                    user_id=1, user=requester, volunteer_id=2, volunteer=volunteer)
+        for i in range(rows)
+    ]
+
+
+def response_model_path(tasks) -> bytes:
+    return json.dumps(jsonable_encoder(TASK_LIST.validate_python(tasks, from_attributes=True))).encode()
+
+
+def pydantic_json_path(tasks) -> bytes:
+    return TASK_LIST.dump_json(TASK_LIST.validate_python(tasks, from_attributes=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.rows)
+    expected = json.loads(response_model_path(tasks))
+    results = {"rows": args.rows, "repeat": args.repeat, "orjson": orjson is not None}
+
+    for name, fn in (("response_model", response_model_path),
+                     ("pydantic_json", pydantic_json_path),
+                     ("fast_path", tasks_to_json)):
+        assert json.loads(fn(tasks)) == expected, f"{name} output differs"
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            fn(tasks)
+        elapsed = time.perf_counter() - start
+        results[f"{name}_rows_per_sec"] = round(args.rows * args.repeat / elapsed)
+
+    results["speedup_vs_response_model"] = round(
+        results["fast_path_rows_per_sec"] / results["response_model_rows_per_sec"], 2
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()